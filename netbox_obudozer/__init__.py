@@ -35,6 +35,8 @@ class ObudozerPluginConfig(PluginConfig):
         # Настройки синхронизации
         'sync_enabled': True,
         'auto_sync_interval': 3600,  # секунды (1 час)
+        'vcenter_page_size': 250,    # ВМ на страницу PropertyCollector
+        'vcenter_cache_ttl': 60,     # TTL кэша списка ВМ в процессе (секунды)
 
         # Настройки GitLab
         'gitlab_url': '',
@@ -61,5 +63,15 @@ class ObudozerPluginConfig(PluginConfig):
         # Импортируем signals для регистрации обработчиков синхронизации
         from . import signals  # noqa: F401
 
+        # Прогреваем TCP-подключение к Redis очереди задач, чтобы первый
+        # enqueue из HTTP-запроса не платил за установку соединения
+        try:
+            import django_rq
+            django_rq.get_queue('default').connection.ping()
+        except Exception:
+            # Очередь может быть недоступна на этапе старта (миграции,
+            # management-команды) - не мешаем инициализации приложения
+            pass
+
 
 config = ObudozerPluginConfig
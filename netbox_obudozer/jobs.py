@@ -3,9 +3,16 @@
 
 Использует встроенный NetBox JobRunner для асинхронной синхронизации VM.
 """
+from django.core.cache import cache
 from netbox.jobs import JobRunner
 
-from .sync import sync_vcenter_vms, sync_cluster_to_service
+from .sync import (
+    SYNC_STATUS_CACHE_KEY,
+    publish_sync_progress,
+    sync_vcenter_vms,
+    sync_cluster_to_service,
+    sync_services_custom_fields,
+)
 
 # Привязки кластер → услуга, которые синхронизируются автоматически после vCenter sync
 # Формат: (service_id, cluster_id)
@@ -48,6 +55,7 @@ class VCenterSyncJob(JobRunner):
             Exception: При критической ошибке синхронизации
         """
         self.logger.info("🚀 Запуск синхронизации vCenter...")
+        publish_sync_progress('running', 'Синхронизация запущена')
 
         try:
             # Вызываем основную функцию синхронизации с logger
@@ -82,7 +90,58 @@ class VCenterSyncJob(JobRunner):
                 for service_id, cluster_id in AUTO_CLUSTER_SERVICE_BINDINGS:
                     sync_cluster_to_service(service_id, cluster_id, logger=self.logger)
 
+            # Счетчики изменились - сбрасываем кэш статуса, чтобы дашборд
+            # сразу увидел свежие цифры, не дожидаясь истечения TTL
+            cache.delete(SYNC_STATUS_CACHE_KEY)
+
+            publish_sync_progress(
+                'completed',
+                f'Создано: {result.created}, обновлено: {result.updated}, '
+                f'без изменений: {result.unchanged}, '
+                f'недоступно: {result.marked_missing}'
+            )
+
         except Exception as e:
             # Критическая ошибка - логируем и пробрасываем исключение
             self.logger.error(f"❌ Критическая ошибка синхронизации: {str(e)}")
+            publish_sync_progress('errored', str(e))
+            raise
+
+
+class ServicesCFSyncJob(JobRunner):
+    """
+    Фоновая задача ресинхронизации custom fields услуг OBU.
+
+    Обновляет obu_services/has_obu_services, tenant и role для всех VM.
+    Ранее выполнялась синхронно внутри HTTP-запроса; при тысячах VM это
+    удерживало воркер и упиралось в таймауты прокси, поэтому работа
+    вынесена в очередь по образцу VCenterSyncJob.
+    """
+
+    class Meta:
+        name = "OBU Services Custom Field Sync"
+        description = "Ресинхронизация custom fields услуг OBU для всех VM"
+
+    def run(self, *args, **kwargs):
+        """
+        Выполняет ресинхронизацию с передачей self.logger
+        для отображения прогресса в UI.
+        """
+        self.logger.info("🚀 Запуск ресинхронизации custom fields услуг...")
+
+        try:
+            result = sync_services_custom_fields(logger=self.logger)
+
+            if result.get('error'):
+                raise RuntimeError(result['error'])
+
+            self.logger.info("=" * 60)
+            self.logger.info("✅ Ресинхронизация завершена успешно")
+            self.logger.info(f"Обновлено obu_services: {result['updated_cf']}")
+            self.logger.info(f"Обновлено tenant: {result['updated_tenant']}")
+            self.logger.info(f"Обновлено has_obu_services: {result['updated_flag']}")
+            self.logger.info("=" * 60)
+
+        except Exception as e:
+            self.logger.error(f"❌ Критическая ошибка ресинхронизации: {str(e)}")
             raise
@@ -0,0 +1,31 @@
+"""
+Management-команда пересчета денормализованного счетчика vm_count услуг OBU.
+
+Счетчик поддерживается сигналами на ServiceVMAssignment; команда нужна для
+первичной инициализации после добавления поля и для починки расхождений
+(например, после массовых операций в обход ORM).
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from netbox_obudozer.models import ObuServices
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованный счетчик vm_count услуг OBU'
+
+    def handle(self, *args, **options):
+        # Фактические значения считаются одним агрегатным запросом,
+        # перезаписываются только разошедшиеся строки
+        to_update = []
+        for service in ObuServices.objects.annotate(actual=Count('vm_assignments')):
+            if service.vm_count != service.actual:
+                service.vm_count = service.actual
+                to_update.append(service)
+
+        if to_update:
+            ObuServices.objects.bulk_update(to_update, ['vm_count'], batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано услуг: {len(to_update)} (всего проверено: {ObuServices.objects.count()})'
+        ))
@@ -56,6 +56,17 @@ class ObuServices(ContactsMixin, NetBoxModel):
         help_text='Роль, назначаемая виртуальным машинам этой услуги'
     )
 
+    vm_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество VM',
+        help_text=(
+            'Денормализованный счетчик привязанных VM. Поддерживается '
+            'сигналами на ServiceVMAssignment; пересчет с нуля - '
+            'management-команда recalculate_vm_counts'
+        ),
+    )
+
     # Reverse relation для ContactAssignment (GenericForeignKey)
     contact_assignments = GenericRelation(
         to='tenancy.ContactAssignment',
@@ -6,11 +6,51 @@ Django signals для автоматической синхронизации cu
 - custom field 'obu_services' на связанных виртуальных машинах
 - tenant на связанных виртуальных машинах
 """
+from django.db.models import F
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import ServiceVMAssignment, ObuServices
 
 
+@receiver(post_save, sender=ServiceVMAssignment)
+def increment_service_vm_count(sender, instance, created, **kwargs):
+    """
+    Инкрементирует денормализованный счетчик vm_count услуги.
+
+    Счетчик поддерживается на месте через F-выражение (атомарный UPDATE
+    на стороне БД), чтобы спискам услуг не приходилось считать
+    Count('vm_assignments') на каждый рендер.
+
+    Args:
+        sender: Класс модели (ServiceVMAssignment)
+        instance: Экземпляр ServiceVMAssignment
+        created: True если привязка только что создана
+        **kwargs: Дополнительные параметры сигнала
+    """
+    if created:
+        ObuServices.objects.filter(pk=instance.service_id).update(
+            vm_count=F('vm_count') + 1
+        )
+
+
+@receiver(post_delete, sender=ServiceVMAssignment)
+def decrement_service_vm_count(sender, instance, **kwargs):
+    """
+    Декрементирует денормализованный счетчик vm_count услуги.
+
+    Фильтр vm_count__gt=0 защищает от ухода в минус, если счетчик
+    разошелся с фактом (тогда его чинит recalculate_vm_counts).
+
+    Args:
+        sender: Класс модели (ServiceVMAssignment)
+        instance: Экземпляр ServiceVMAssignment
+        **kwargs: Дополнительные параметры сигнала
+    """
+    ObuServices.objects.filter(pk=instance.service_id, vm_count__gt=0).update(
+        vm_count=F('vm_count') - 1
+    )
+
+
 @receiver([post_save, post_delete], sender=ServiceVMAssignment)
 def sync_vm_services_custom_field(sender, instance, **kwargs):
     """
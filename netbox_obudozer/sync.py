@@ -8,16 +8,108 @@
 
 Использует встроенный NetBox механизм логирования изменений через ObjectChange.
 """
-from typing import Dict, List, Tuple
+import csv
+import hashlib
+import io
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from typing import Dict, Iterable, List, Tuple
 from datetime import datetime
-from django.db import transaction
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q
 from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 from virtualization.models import ClusterType, Cluster, ClusterGroup, VirtualMachine, VirtualDisk
 from extras.models import CustomField
+from utilities.ordering import naturalize
 
 from .vmware import get_vcenter_vms, test_vcenter_connection, get_cluster_group_name, get_cluster_type
 
+# django-fast-update (опциональная зависимость): на PostgreSQL пишет большие
+# пакеты существенно быстрее штатного bulk_update, что заметно на
+# custom_field_data (JSON сериализуется на каждую строку). Без пакета
+# прозрачно работаем через bulk_update
+try:
+    from fast_update.fast import fast_update as _fast_update
+except ImportError:
+    _fast_update = None
+
+logger_module = logging.getLogger('netbox.plugins.netbox_obudozer')
+
+# Ключ кэша доступности vCenter
+VCENTER_AVAILABLE_CACHE_KEY = 'netbox_obudozer:vcenter_available'
+
+# Ключ кэша хэша данных vCenter последнего успешного прогона
+PAYLOAD_HASH_CACHE_KEY = 'netbox_obudozer:last_payload_sha256'
+
+# Ключ кэша статуса синхронизации (дашборд опрашивает его постоянно)
+SYNC_STATUS_CACHE_KEY = 'netbox_obudozer:sync_status'
+
+# Ключ кэша прогресса текущего прогона (публикуется VCenterSyncJob,
+# читается SSE-эндпоинтом sync_vcenter_events_view)
+SYNC_PROGRESS_CACHE_KEY = 'netbox_obudozer:sync_progress'
+
+
+def publish_sync_progress(status: str, detail: str = '', ttl: int = 3600):
+    """
+    Публикует состояние текущего прогона синхронизации в кэш.
+
+    Args:
+        status: Состояние ('pending', 'running', 'completed', 'errored')
+        detail: Человекочитаемая деталь (статистика или текст ошибки)
+        ttl: Время жизни записи в секундах
+    """
+    cache.set(SYNC_PROGRESS_CACHE_KEY, {
+        'status': status,
+        'detail': detail,
+        'updated': timezone.now().isoformat(),
+    }, ttl)
+
+
+def _payload_hash(vcenter_vms: List[Dict]) -> str:
+    """
+    Вычисляет стабильный SHA-256 хэш данных vCenter.
+
+    VM сортируются по имени, каждая сериализуется с сортировкой ключей,
+    поэтому хэш не зависит от порядка выдачи vCenter.
+
+    Args:
+        vcenter_vms: Список VM из vCenter
+
+    Returns:
+        str: hex-хэш данных
+    """
+    hasher = hashlib.sha256()
+    for vm_data in sorted(vcenter_vms, key=lambda v: v['name']):
+        hasher.update(json.dumps(vm_data, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+
+def _cached_vcenter_available(ttl: int = 30) -> bool:
+    """
+    Проверяет доступность vCenter с кэшированием результата.
+
+    Полная проверка - это TCP + TLS + SOAP-логин (сотни миллисекунд),
+    а дашборд опрашивает статус каждые несколько секунд. Результат
+    кэшируется на короткий TTL, чтобы опросы не ходили в vCenter.
+
+    Args:
+        ttl: Время жизни кэшированного результата в секундах
+
+    Returns:
+        bool: True если vCenter доступен
+    """
+    available = cache.get(VCENTER_AVAILABLE_CACHE_KEY)
+    if available is None:
+        available = test_vcenter_connection()
+        cache.set(VCENTER_AVAILABLE_CACHE_KEY, available, ttl)
+    return available
+
 
 class SyncResult:
     """
@@ -45,16 +137,19 @@ class SyncResult:
         self.duration = 0.0
         self.start_time = None
         self.end_time = None
-    
+        # Монотонная точка отсчета: perf_counter не зависит от скачков
+        # системных часов и заметно дешевле timezone.now()
+        self._t0 = time.perf_counter()
+
     def start(self):
         """Отмечает начало синхронизации"""
+        self._t0 = time.perf_counter()
         self.start_time = timezone.now()
-    
+
     def finish(self):
         """Отмечает завершение синхронизации и вычисляет длительность"""
+        self.duration = time.perf_counter() - self._t0
         self.end_time = timezone.now()
-        if self.start_time:
-            self.duration = (self.end_time - self.start_time).total_seconds()
     
     def __str__(self):
         """Строковое представление результата"""
@@ -130,6 +225,26 @@ def _normalize_datetime_for_comparison(value):
     return value
 
 
+# Разделяемый пустой dict для VM без изменений: в типичном прогоне таких
+# подавляющее большинство, и на них не хочется выделять по пустому словарю.
+# Никогда не мутировать!
+_NO_CHANGES = {}
+
+# Простые custom fields, сравниваемые как есть (без нормализации)
+_SIMPLE_CF_FIELDS = (
+    'ip_address',
+    'tools_status',
+    'vmtools_description',
+    'vmtools_version_number',
+    'os_pretty_name',
+    'os_family_name',
+    'os_distro_name',
+    'os_distro_version',
+    'os_kernel_version',
+    'os_bitness',
+)
+
+
 def get_field_changes(vm: VirtualMachine, vcenter_data: Dict, cluster_group_name: str) -> Dict:
     """
     Определяет какие поля изменились.
@@ -140,33 +255,49 @@ def get_field_changes(vm: VirtualMachine, vcenter_data: Dict, cluster_group_name
         cluster_group_name: Имя ClusterGroup (для default кластера)
 
     Returns:
-        Dict с измененными полями: {'field_name': {'old': old_value, 'new': new_value}}
+        Dict с измененными полями: {'field_name': new_value}.
+        Старые значения не сохраняются — фаза применения читает только новые,
+        а плоский словарь не плодит вложенные dict на каждое поле.
 
     Example:
         >>> changes = get_field_changes(vm, {'state': 'running'}, 'vcenter.example.com')
         >>> print(changes)
-        {'status': {'old': 'offline', 'new': 'active'}}
+        {'status': 'active'}
     """
-    changes = {}
-
     # Конвертация state из vCenter в status NetBox
     vcenter_status = 'active' if vcenter_data['state'] == 'running' else 'offline'
 
+    # Быстрый путь: функция вызывается на каждую VM, и почти для всех
+    # ничего не меняется. Проверяем равенство всех полей и возвращаем
+    # разделяемый пустой dict без аллокаций; полный проход ниже платим
+    # только за VM с реальными изменениями
+    cfd = vm.custom_field_data or _NO_CHANGES
+    if (
+        vm.status == vcenter_status
+        and vm.vcpus == vcenter_data.get('vcpus')
+        and vm.memory == vcenter_data.get('memory')
+        and (not vcenter_data.get('vcenter_id')
+             or cfd.get('vcenter_id') == vcenter_data['vcenter_id'])
+        and vm.cluster.name == (vcenter_data.get('vcenter_cluster') or cluster_group_name)
+        and (not vcenter_data.get('vcenter_cluster')
+             or cfd.get('vcenter_cluster') == vcenter_data['vcenter_cluster'])
+        and all(cfd.get(f) == vcenter_data.get(f) for f in _SIMPLE_CF_FIELDS)
+        and _normalize_datetime_for_comparison(cfd.get('creation_date'))
+            == _normalize_datetime_for_comparison(vcenter_data.get('creation_date'))
+    ):
+        return _NO_CHANGES
+
+    changes = {}
+
     # Проверяем status
     if vm.status != vcenter_status:
-        changes['status'] = {
-            'old': vm.status,
-            'new': vcenter_status
-        }
+        changes['status'] = vcenter_status
 
     # Проверяем vcenter_id через Custom Fields
     current_vcenter_id = vm.custom_field_data.get('vcenter_id') if vm.custom_field_data else None
     new_vcenter_id = vcenter_data.get('vcenter_id')
     if new_vcenter_id and current_vcenter_id != new_vcenter_id:
-        changes['vcenter_id'] = {
-            'old': current_vcenter_id,
-            'new': new_vcenter_id
-        }
+        changes['vcenter_id'] = new_vcenter_id
 
     # Проверяем vcenter_cluster через Custom Fields
     current_vcenter_cluster = vm.custom_field_data.get('vcenter_cluster') if vm.custom_field_data else None
@@ -177,109 +308,44 @@ def get_field_changes(vm: VirtualMachine, vcenter_data: Dict, cluster_group_name
 
     # Проверяем несоответствие кластера (для миграции из vcenter_obu)
     if vm.cluster.name != expected_cluster_name:
-        changes['vcenter_cluster'] = {
-            'old': current_vcenter_cluster,
-            'new': new_vcenter_cluster
-        }
+        changes['vcenter_cluster'] = new_vcenter_cluster
     # Или изменение в custom field
     elif new_vcenter_cluster and current_vcenter_cluster != new_vcenter_cluster:
-        changes['vcenter_cluster'] = {
-            'old': current_vcenter_cluster,
-            'new': new_vcenter_cluster
-        }
+        changes['vcenter_cluster'] = new_vcenter_cluster
 
     # Проверяем vcpus
     if vm.vcpus != vcenter_data.get('vcpus'):
-        changes['vcpus'] = {
-            'old': vm.vcpus,
-            'new': vcenter_data.get('vcpus')
-        }
+        changes['vcpus'] = vcenter_data.get('vcpus')
 
     # Проверяем memory
     if vm.memory != vcenter_data.get('memory'):
-        changes['memory'] = {
-            'old': vm.memory,
-            'new': vcenter_data.get('memory')
-        }
-
-    # Проверяем ip_address через Custom Fields
-    current_ip = vm.custom_field_data.get('ip_address') if vm.custom_field_data else None
-    new_ip = vcenter_data.get('ip_address')
-
-    if current_ip != new_ip:
-        changes['ip_address'] = {
-            'old': current_ip,
-            'new': new_ip
-        }
-
-    # Проверяем tools_status через Custom Fields
-    current_tools_status = vm.custom_field_data.get('tools_status') if vm.custom_field_data else None
-    new_tools_status = vcenter_data.get('tools_status')
-
-    if current_tools_status != new_tools_status:
-        changes['tools_status'] = {
-            'old': current_tools_status,
-            'new': new_tools_status
-        }
-
-    # Проверяем vmtools_description через Custom Fields
-    current_vmtools_desc = vm.custom_field_data.get('vmtools_description') if vm.custom_field_data else None
-    new_vmtools_desc = vcenter_data.get('vmtools_description')
-
-    if current_vmtools_desc != new_vmtools_desc:
-        changes['vmtools_description'] = {
-            'old': current_vmtools_desc,
-            'new': new_vmtools_desc
-        }
-
-    # Проверяем vmtools_version_number через Custom Fields
-    current_vmtools_ver = vm.custom_field_data.get('vmtools_version_number') if vm.custom_field_data else None
-    new_vmtools_ver = vcenter_data.get('vmtools_version_number')
-
-    if current_vmtools_ver != new_vmtools_ver:
-        changes['vmtools_version_number'] = {
-            'old': current_vmtools_ver,
-            'new': new_vmtools_ver
-        }
+        changes['memory'] = vcenter_data.get('memory')
 
-    # Проверяем OS поля и creation_date через Custom Fields (используем цикл для уменьшения повторений)
-    os_fields = [
-        'os_pretty_name',
-        'os_family_name',
-        'os_distro_name',
-        'os_distro_version',
-        'os_kernel_version',
-        'os_bitness',
-        'creation_date',
-    ]
-
-    for field_name in os_fields:
+    # Проверяем простые custom fields одним циклом (все сравниваются как есть)
+    for field_name in _SIMPLE_CF_FIELDS:
         current_value = vm.custom_field_data.get(field_name) if vm.custom_field_data else None
         new_value = vcenter_data.get(field_name)
 
-        # Специальная обработка для datetime полей
-        if field_name == 'creation_date':
-            current_value = _normalize_datetime_for_comparison(current_value)
-            new_value = _normalize_datetime_for_comparison(new_value)
-
         if current_value != new_value:
-            changes[field_name] = {
-                'old': current_value,
-                'new': new_value
-            }
+            changes[field_name] = new_value
+
+    # creation_date сравниваем (и сохраняем) с нормализацией datetime
+    current_creation = _normalize_datetime_for_comparison(
+        vm.custom_field_data.get('creation_date') if vm.custom_field_data else None
+    )
+    new_creation = _normalize_datetime_for_comparison(vcenter_data.get('creation_date'))
+    if current_creation != new_creation:
+        changes['creation_date'] = new_creation
 
     # Если VM была помечена как failed, но теперь найдена в vCenter
     if vm.status == 'failed':
-        changes['status'] = {
-            'old': 'failed',
-            'new': vcenter_status
-        }
+        changes['status'] = vcenter_status
 
     return changes
 
 
 def calculate_diff(
-    vcenter_vms: List[Dict],
+    vcenter_vms: Iterable[Dict],
     existing_vms: Dict[str, VirtualMachine],
     cluster_group_name: str,
     logger=None
@@ -287,8 +353,11 @@ def calculate_diff(
     """
     ФАЗА 2: Вычисляет различия между vCenter и NetBox.
 
+    Классификация и набор имен строятся за один проход, поэтому на вход
+    годится любой итерируемый источник VM, не только список.
+
     Args:
-        vcenter_vms: Список VM из vCenter
+        vcenter_vms: VM из vCenter (любой iterable словарей)
         existing_vms: Словарь существующих VM в NetBox (name -> VMRecord)
         cluster_group_name: Имя ClusterGroup (для default кластера)
         logger: Опциональный logger для фоновых задач (JobRunner.logger)
@@ -314,8 +383,8 @@ def calculate_diff(
             if changes:
                 # Логируем изменения для диагностики (только первые несколько)
                 if logger and logged_changes_count < max_log_changes:
-                    changes_str = ', '.join([f"{field}: '{change['old']}' → '{change['new']}'"
-                                             for field, change in changes.items()])
+                    changes_str = ', '.join([f"{field} → '{new_value}'"
+                                             for field, new_value in changes.items()])
                     logger.info(f"  [DIFF] VM '{vm_name}' будет обновлена: {changes_str}")
                     logged_changes_count += 1
                 diff.to_update.append((vm_record, changes))
@@ -325,9 +394,11 @@ def calculate_diff(
             # VM не существует - нужно создать
             diff.to_create.append(vm_data)
 
-    # Находим VM которых нет в vCenter
-    for vm_name, vm_record in existing_vms.items():
-        if vm_name not in vcenter_names and vm_record.status != 'failed':
+    # Находим VM которых нет в vCenter: разность множеств выполняется на
+    # C-уровне, и предикат по статусу оплачивается только на малом остатке
+    for vm_name in existing_vms.keys() - vcenter_names:
+        vm_record = existing_vms[vm_name]
+        if vm_record.status != 'failed':
             diff.to_mark_missing.append(vm_record)
 
     return diff
@@ -366,6 +437,67 @@ def get_or_create_cluster(
     return cluster
 
 
+def _bulk_create_disks(disks: List[VirtualDisk]) -> None:
+    """
+    Массово создает объекты VirtualDisk.
+
+    На PostgreSQL использует COPY FROM STDIN — самый быстрый путь вставки,
+    заметно быстрее многострочных INSERT при больших синхронизациях.
+    На других СУБД (и при любой ошибке COPY) откатывается на bulk_create.
+
+    Args:
+        disks: Несохраненные экземпляры VirtualDisk
+    """
+    if not disks:
+        return
+
+    if connection.vendor == 'postgresql':
+        now = timezone.now().isoformat()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for disk in disks:
+            writer.writerow([
+                disk.virtual_machine_id,
+                disk.name,
+                # _name (NaturalOrderingField) - NOT NULL без default в БД:
+                # при обычном save() его заполняет pre_save, при COPY
+                # наталайзим значение сами
+                naturalize(disk.name, max_length=100),
+                disk.size,
+                disk.description,
+                '{}',
+                now,
+                now,
+            ])
+        buffer.seek(0)
+
+        copy_sql = (
+            "COPY virtualization_virtualdisk "
+            "(virtual_machine_id, name, _name, size, description, custom_field_data, created, last_updated) "
+            "FROM STDIN WITH CSV"
+        )
+        try:
+            # Отдельный atomic: если вызывающий код уже открыл транзакцию,
+            # неудавшийся COPY откатывается до savepoint и не рушит ее
+            # ("current transaction is aborted") - откат на bulk_create
+            # остается рабочим
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    raw_cursor = cursor.cursor
+                    if hasattr(raw_cursor, 'copy_expert'):
+                        # psycopg2
+                        raw_cursor.copy_expert(copy_sql, buffer)
+                    else:
+                        # psycopg 3
+                        with raw_cursor.copy(copy_sql) as copy_op:
+                            copy_op.write(buffer.getvalue())
+            return
+        except Exception as e:
+            logger_module.warning(f"COPY-вставка дисков не удалась, откат на bulk_create: {e}")
+
+    VirtualDisk.objects.bulk_create(disks, batch_size=1000)
+
+
 def sync_vm_disks(vm: VirtualMachine, vcenter_disks: List[Dict]) -> bool:
     """
     Синхронизирует диски виртуальной машины с данными из vCenter.
@@ -395,6 +527,7 @@ def sync_vm_disks(vm: VirtualMachine, vcenter_disks: List[Dict]) -> bool:
     # Получаем существующие диски из NetBox
     existing_disks = {disk.name: disk for disk in VirtualDisk.objects.filter(virtual_machine=vm)}
     vcenter_disk_names = set()
+    new_disks = []
 
     # Обрабатываем диски из vCenter
     for disk_data in vcenter_disks:
@@ -428,15 +561,18 @@ def sync_vm_disks(vm: VirtualMachine, vcenter_disks: List[Dict]) -> bool:
                 disk.save()
                 changes_made = True
         else:
-            # Создаем новый диск
-            VirtualDisk.objects.create(
+            # Новый диск — откладываем для массовой вставки
+            new_disks.append(VirtualDisk(
                 virtual_machine=vm,
                 name=disk_name,
                 size=disk_data['size_mb'],
                 description=description
-            )
+            ))
             changes_made = True
 
+    # Массово создаем новые диски одним запросом (COPY на PostgreSQL)
+    _bulk_create_disks(new_disks)
+
     # Удаляем диски, которых больше нет в vCenter
     for disk_name, disk in existing_disks.items():
         if disk_name not in vcenter_disk_names:
@@ -446,7 +582,6 @@ def sync_vm_disks(vm: VirtualMachine, vcenter_disks: List[Dict]) -> bool:
     return changes_made
 
 
-@transaction.atomic
 def apply_changes(
     diff: VMDiff,
     result: SyncResult,
@@ -459,7 +594,10 @@ def apply_changes(
     """
     ФАЗА 3: Применяет изменения к базе данных.
 
-    Выполняется в транзакции для обеспечения целостности данных.
+    Каждая фаза (создание, обновление, пометка отсутствующих) выполняется
+    в собственной короткой транзакции. Одна общая транзакция на весь apply
+    держала бы блокировки на всех затронутых VM до конца синхронизации и
+    блокировала бы параллельные запросы UI/API к этим строкам.
 
     Args:
         diff: Объект с вычисленными различиями
@@ -473,14 +611,27 @@ def apply_changes(
     Returns:
         Обновленный SyncResult
     """
+    # Единая метка времени на весь прогон. Перенести ее в SQL через
+    # функцию Now() нельзя: last_synced хранится ключом внутри JSON-поля
+    # custom_field_data, а не отдельной колонкой, поэтому значение
+    # неизбежно проставляется на стороне Python при сборке словаря
     sync_time = timezone.now()
 
+    # Индекс данных vCenter по имени: фазы обновления и проверки дисков
+    # обращаются к нему по ключу вместо линейного поиска по списку на
+    # каждую VM (O(N) вместо O(N²) на весь прогон)
+    vcenter_by_name = {v['name']: v for v in vcenter_vms}
+
     # Создание новых VM
     if diff.to_create:
         if logger:
             logger.info(f"  → Создание {len(diff.to_create)} новых VM...")
 
-        for idx, vm_data in enumerate(diff.to_create, 1):
+        # Кластеры получаем/создаем один раз на уникальное имя
+        cluster_cache = {}
+        new_vms = []
+
+        for vm_data in diff.to_create:
             try:
                 # Конвертация state → status
                 status = 'active' if vm_data['state'] == 'running' else 'offline'
@@ -488,52 +639,75 @@ def apply_changes(
                 # Определить имя кластера (или использовать ClusterGroup если не указан)
                 vcenter_cluster_name = vm_data.get('vcenter_cluster') or cluster_group_name
 
-                # Получить или создать кластер "на лету"
-                vm_cluster = get_or_create_cluster(
-                    vcenter_cluster_name,
-                    cluster_type,
-                    cluster_group
-                )
-
-                vm = VirtualMachine.objects.create(
+                vm_cluster = cluster_cache.get(vcenter_cluster_name)
+                if vm_cluster is None:
+                    vm_cluster = get_or_create_cluster(
+                        vcenter_cluster_name,
+                        cluster_type,
+                        cluster_group
+                    )
+                    cluster_cache[vcenter_cluster_name] = vm_cluster
+
+                # Custom Fields заполняем сразу, чтобы не делать второй save()
+                new_vms.append(VirtualMachine(
                     name=vm_data['name'],
                     cluster=vm_cluster,  # Динамический кластер
                     status=status,
                     vcpus=vm_data.get('vcpus'),
                     memory=vm_data.get('memory'),
-                )
+                    custom_field_data={
+                        'vcenter_id': vm_data.get('vcenter_id'),
+                        'last_synced': sync_time.isoformat(),
+                        'vcenter_cluster': vm_data.get('vcenter_cluster'),
+                        'ip_address': vm_data.get('ip_address'),
+                        'tools_status': vm_data.get('tools_status'),
+                        'vmtools_description': vm_data.get('vmtools_description'),
+                        'vmtools_version_number': vm_data.get('vmtools_version_number'),
+                        'os_pretty_name': vm_data.get('os_pretty_name'),
+                        'os_family_name': vm_data.get('os_family_name'),
+                        'os_distro_name': vm_data.get('os_distro_name'),
+                        'os_distro_version': vm_data.get('os_distro_version'),
+                        'os_kernel_version': vm_data.get('os_kernel_version'),
+                        'os_bitness': vm_data.get('os_bitness'),
+                        'creation_date': vm_data.get('creation_date'),
+                    },
+                ))
 
-                # Заполнение Custom Fields
-                vm.custom_field_data = vm.custom_field_data or {}
-                vm.custom_field_data['vcenter_id'] = vm_data.get('vcenter_id')
-                vm.custom_field_data['last_synced'] = sync_time.isoformat()
-                vm.custom_field_data['vcenter_cluster'] = vm_data.get('vcenter_cluster')
-                vm.custom_field_data['ip_address'] = vm_data.get('ip_address')
-                vm.custom_field_data['tools_status'] = vm_data.get('tools_status')
-                vm.custom_field_data['vmtools_description'] = vm_data.get('vmtools_description')
-                vm.custom_field_data['vmtools_version_number'] = vm_data.get('vmtools_version_number')
-                vm.custom_field_data['os_pretty_name'] = vm_data.get('os_pretty_name')
-                vm.custom_field_data['os_family_name'] = vm_data.get('os_family_name')
-                vm.custom_field_data['os_distro_name'] = vm_data.get('os_distro_name')
-                vm.custom_field_data['os_distro_version'] = vm_data.get('os_distro_version')
-                vm.custom_field_data['os_kernel_version'] = vm_data.get('os_kernel_version')
-                vm.custom_field_data['os_bitness'] = vm_data.get('os_bitness')
-                vm.custom_field_data['creation_date'] = vm_data.get('creation_date')
-                vm.save()
-
-                # Синхронизируем диски для только что созданной VM
-                sync_vm_disks(vm, vm_data.get('disks', []))
-
-                result.created += 1
-
-                # Логируем каждую 10-ую VM или последнюю
-                if logger and (idx % 10 == 0 or idx == len(diff.to_create)):
-                    logger.info(f"    ✓ Создано {idx}/{len(diff.to_create)} VM")
+            except Exception as e:
+                result.errors.append(f"Ошибка подготовки VM '{vm_data['name']}': {str(e)}")
+                if logger:
+                    logger.error(f"    ✗ Ошибка подготовки '{vm_data['name']}'")
 
+        if new_vms:
+            try:
+                # Пакетная вставка: ⌈N/500⌉ запросов вместо INSERT + save() на каждую VM.
+                # Короткая транзакция только на вставку - блокировки не
+                # растягиваются на остальные фазы
+                with transaction.atomic():
+                    VirtualMachine.objects.bulk_create(new_vms, batch_size=500)
+                result.created = len(new_vms)
             except Exception as e:
-                result.errors.append(f"Ошибка создания VM '{vm_data['name']}': {str(e)}")
+                # Пакет не прошел (например, конфликт имен) - создаем по одной,
+                # чтобы одна плохая строка не потопила остальные
                 if logger:
-                    logger.error(f"    ✗ Ошибка создания '{vm_data['name']}'")
+                    logger.warning(f"    ⚠ bulk_create не удался ({e}), по-строчное создание...")
+                for vm in new_vms:
+                    try:
+                        vm.pk = None
+                        vm.save()
+                        result.created += 1
+                    except Exception as row_error:
+                        result.errors.append(f"Ошибка создания VM '{vm.name}': {str(row_error)}")
+
+            # Синхронизируем диски созданных VM (bulk_create проставил pk)
+            data_by_name = {d['name']: d for d in diff.to_create}
+            for vm in new_vms:
+                if vm.pk is None:
+                    continue
+                try:
+                    sync_vm_disks(vm, data_by_name.get(vm.name, {}).get('disks', []))
+                except Exception as e:
+                    result.errors.append(f"Ошибка синхронизации дисков для VM '{vm.name}': {str(e)}")
 
         if logger:
             logger.info(f"  ✓ Создано VM: {result.created}")
@@ -543,67 +717,90 @@ def apply_changes(
         if logger:
             logger.info(f"  → Обновление {len(diff.to_update)} существующих VM...")
 
-        for idx, (vm, changes) in enumerate(diff.to_update, 1):
+        # Список custom fields для обработки в цикле
+        custom_fields = [
+            'vcenter_id', 'ip_address', 'tools_status',
+            'vmtools_description', 'vmtools_version_number',
+            'os_pretty_name', 'os_family_name', 'os_distro_name',
+            'os_distro_version', 'os_kernel_version', 'os_bitness',
+            'creation_date'
+        ]
+
+        # Накапливаем измененные объекты и пишем их одним bulk_update
+        # вместо UPDATE на каждую VM (это доминирующая стоимость больших синхронизаций)
+        to_bulk = []
+        bulk_fields = {'custom_field_data'}
+
+        for vm, changes in diff.to_update:
             try:
                 # Логируем причину обновления
                 if logger:
-                    changes_summary = ', '.join([f"{field}: {change['old']} → {change['new']}"
-                                                  for field, change in changes.items()])
+                    changes_summary = ', '.join([f"{field} → {new_value}"
+                                                 for field, new_value in changes.items()])
                     logger.info(f"    VM '{vm.name}': {changes_summary}")
 
-                # Список custom fields для обработки в цикле
-                custom_fields = [
-                    'vcenter_id', 'ip_address', 'tools_status',
-                    'vmtools_description', 'vmtools_version_number',
-                    'os_pretty_name', 'os_family_name', 'os_distro_name',
-                    'os_distro_version', 'os_kernel_version', 'os_bitness',
-                    'creation_date'
-                ]
-
                 # Применяем изменения
-                for field_name, change in changes.items():
+                for field_name, new_value in changes.items():
                     if field_name == 'vcenter_cluster':
                         vm.custom_field_data = vm.custom_field_data or {}
-                        vm.custom_field_data['vcenter_cluster'] = change['new']
+                        vm.custom_field_data['vcenter_cluster'] = new_value
 
                         # Также обновить NetBox cluster
-                        new_vcenter_cluster = change['new'] or cluster_group_name
+                        new_vcenter_cluster = new_value or cluster_group_name
                         new_cluster = get_or_create_cluster(
                             new_vcenter_cluster,
                             cluster_type,
                             cluster_group
                         )
                         vm.cluster = new_cluster
+                        bulk_fields.add('cluster')
                     elif field_name in custom_fields:
                         # Обработка всех custom fields в цикле
                         vm.custom_field_data = vm.custom_field_data or {}
-                        vm.custom_field_data[field_name] = change['new']
+                        vm.custom_field_data[field_name] = new_value
                     else:
                         # Встроенные поля VirtualMachine (vcpus, memory, status)
-                        setattr(vm, field_name, change['new'])
+                        setattr(vm, field_name, new_value)
+                        bulk_fields.add(field_name)
 
                 vm.custom_field_data = vm.custom_field_data or {}
                 vm.custom_field_data['last_synced'] = sync_time.isoformat()
-                vm.save()
-                # NetBox автоматически создаст ObjectChange запись
+                to_bulk.append(vm)
 
                 # Синхронизируем диски для обновленной VM
-                # Находим данные VM из vCenter для получения информации о дисках
-                vm_data = next((v for v in vcenter_vms if v['name'] == vm.name), None)
+                vm_data = vcenter_by_name.get(vm.name)
                 if vm_data:
                     sync_vm_disks(vm, vm_data.get('disks', []))
 
-                result.updated += 1
-
-                # Логируем каждую 10-ую VM или последнюю
-                if logger and (idx % 10 == 0 or idx == len(diff.to_update)):
-                    logger.info(f"    ✓ Обновлено {idx}/{len(diff.to_update)} VM")
-
             except Exception as e:
                 result.errors.append(f"Ошибка обновления VM '{vm.name}': {str(e)}")
                 if logger:
                     logger.error(f"    ✗ Ошибка обновления '{vm.name}'")
 
+        if to_bulk:
+            try:
+                # Пакетная запись: ⌈N/500⌉ запросов вместо N отдельных save().
+                # ObjectChange записи при этом не создаются - для массовой
+                # синхронизации из vCenter это осознанный компромисс
+                with transaction.atomic():
+                    VirtualMachine.objects.bulk_update(
+                        to_bulk,
+                        fields=sorted(bulk_fields),
+                        batch_size=500
+                    )
+                result.updated = len(to_bulk)
+            except Exception as e:
+                # При сбое пакета откатываемся на по-строчное сохранение,
+                # чтобы одна проблемная VM не блокировала остальные
+                if logger:
+                    logger.warning(f"    ⚠ bulk_update не удался ({e}), по-строчное сохранение...")
+                for vm in to_bulk:
+                    try:
+                        vm.save()
+                        result.updated += 1
+                    except Exception as row_error:
+                        result.errors.append(f"Ошибка обновления VM '{vm.name}': {str(row_error)}")
+
         if logger:
             logger.info(f"  ✓ Обновлено VM: {result.updated}")
 
@@ -615,8 +812,7 @@ def apply_changes(
 
         for idx, vm in enumerate(diff.to_skip, 1):
             try:
-                # Находим данные VM из vCenter для получения информации о дисках
-                vm_data = next((v for v in vcenter_vms if v['name'] == vm.name), None)
+                vm_data = vcenter_by_name.get(vm.name)
                 if vm_data:
                     # Синхронизируем диски (изменения будут только если диски реально изменились)
                     sync_vm_disks(vm, vm_data.get('disks', []))
@@ -636,28 +832,33 @@ def apply_changes(
         logger.info(f"  ✓ Без изменений: {result.unchanged} VM")
 
     # Пометка отсутствующих VM статусом failed
-    missing_ids = [vm.id for vm in diff.to_mark_missing]
-    if missing_ids:
+    if diff.to_mark_missing:
         if logger:
-            logger.info(f"  → Пометка {len(missing_ids)} VM как недоступных...")
+            logger.info(f"  → Пометка {len(diff.to_mark_missing)} VM как недоступных...")
 
         try:
-            # Массовое обновление статуса
-            VirtualMachine.objects.filter(id__in=missing_ids).update(
-                status='failed'
-            )
-            # Обновляем last_synced в Custom Fields
-            missing_vms = VirtualMachine.objects.filter(id__in=missing_ids)
-            for idx, vm in enumerate(missing_vms, 1):
+            # last_synced живет в JSON-поле, его по-прежнему пишем bulk_update
+            for vm in diff.to_mark_missing:
+                vm.status = 'failed'
                 vm.custom_field_data = vm.custom_field_data or {}
                 vm.custom_field_data['last_synced'] = sync_time.isoformat()
-                vm.save()
 
-                # Логируем каждую 10-ую VM или последнюю
-                if logger and (idx % 10 == 0 or idx == len(missing_ids)):
-                    logger.info(f"    ✓ Помечено {idx}/{len(missing_ids)} VM")
+            # Статус и отметка last_synced коммитятся вместе, но отдельно
+            # от остальных фаз
+            with transaction.atomic():
+                # Статус меняется одним UPDATE на стороне БД - строки не
+                # нужно сериализовать и гонять обратно через bulk_update
+                marked = VirtualMachine.objects.filter(
+                    pk__in=[vm.pk for vm in diff.to_mark_missing]
+                ).update(status='failed')
+
+                VirtualMachine.objects.bulk_update(
+                    diff.to_mark_missing,
+                    fields=['custom_field_data'],
+                    batch_size=1000
+                )
 
-            result.marked_missing = len(missing_ids)
+            result.marked_missing = marked
 
             if logger:
                 logger.info(f"  ✓ Помечено недоступными: {result.marked_missing}")
@@ -672,6 +873,240 @@ def apply_changes(
     return result
 
 
+@lru_cache(maxsize=1)
+def _bootstrap_sync_schema() -> Tuple[ClusterType, ClusterGroup, str]:
+    """
+    Готовит ClusterType, ClusterGroup и Custom Fields для синхронизации.
+
+    Блок выполняет десяток с лишним get_or_create запросов, результат
+    которых между прогонами не меняется, поэтому он вынесен из горячего
+    пути и кэшируется на время жизни процесса.
+
+    Returns:
+        Tuple[ClusterType, ClusterGroup, str]: тип кластера, группа
+        кластеров и имя группы (для default кластера)
+    """
+    # Получаем/создаем ClusterType для vCenter
+
+    cluster_type_value = get_cluster_type()
+    cluster_type_slug = cluster_type_value.lower()
+    cluster_type_name = cluster_type_value
+
+    cluster_type, created = ClusterType.objects.get_or_create(
+        slug=cluster_type_slug,
+        defaults={'name': cluster_type_name}
+    )
+
+
+    # Получаем/создаем ClusterGroup из vcenter_name
+
+    cluster_group_name = get_cluster_group_name()
+
+    # Получаем vcenter_host для описания
+    from .vmware import get_plugin_config
+    config = get_plugin_config()
+    vcenter_host = config.get('vcenter_host', cluster_group_name)
+
+    cluster_group, created = ClusterGroup.objects.get_or_create(
+        name=cluster_group_name,
+        defaults={
+            'slug': cluster_group_name.replace('.', '-').replace('_', '-'),
+            'description': f'vCenter clusters from {vcenter_host}'
+        }
+    )
+
+
+    # Проверяем/создаем Custom Fields
+
+    vcenter_id_field, created = CustomField.objects.get_or_create(
+        name='vcenter_id',
+        defaults={
+            'label': 'vCenter ID',
+            'type': 'text',
+            'description': 'Уникальный идентификатор VM в vCenter',
+            'required': False,
+        }
+    )
+
+    last_synced_field, created = CustomField.objects.get_or_create(
+        name='last_synced',
+        defaults={
+            'label': 'Last Synced',
+            'type': 'datetime',
+            'description': 'Время последней синхронизации с vCenter',
+            'required': False,
+        }
+    )
+
+    vcenter_cluster_field, created = CustomField.objects.get_or_create(
+        name='vcenter_cluster',
+        defaults={
+            'label': 'vCenter Cluster',
+            'type': 'text',
+            'description': 'Имя кластера vCenter, в котором находится ВМ',
+            'required': False,
+        }
+    )
+
+    ip_address_field, created = CustomField.objects.get_or_create(
+        name='ip_address',
+        defaults={
+            'label': 'IP Address',
+            'type': 'text',
+            'description': 'Primary IP address from vCenter (guest.ipAddress)',
+            'required': False,
+        }
+    )
+
+    tools_status_field, created = CustomField.objects.get_or_create(
+        name='tools_status',
+        defaults={
+            'label': 'VMware Tools Status',
+            'type': 'text',
+            'description': 'VMware Tools status from guest.toolsStatus',
+            'required': False,
+        }
+    )
+
+    vmtools_description_field, created = CustomField.objects.get_or_create(
+        name='vmtools_description',
+        defaults={
+            'label': 'VMware Tools Description',
+            'type': 'text',
+            'description': 'VMware Tools description from guestinfo.vmtools.description',
+            'required': False,
+        }
+    )
+
+    vmtools_version_number_field, created = CustomField.objects.get_or_create(
+        name='vmtools_version_number',
+        defaults={
+            'label': 'VMware Tools Version Number',
+            'type': 'text',
+            'description': 'VMware Tools version number from guestinfo.vmtools.versionNumber',
+            'required': False,
+        }
+    )
+
+    os_pretty_name_field, created = CustomField.objects.get_or_create(
+        name='os_pretty_name',
+        defaults={
+            'label': 'OS Pretty Name',
+            'type': 'text',
+            'description': 'OS pretty name from guestInfo.detailed.data (e.g., "Ubuntu 22.04.3 LTS")',
+            'required': False,
+        }
+    )
+
+    os_family_name_field, created = CustomField.objects.get_or_create(
+        name='os_family_name',
+        defaults={
+            'label': 'OS Family Name',
+            'type': 'text',
+            'description': 'OS family name from guestInfo.detailed.data (e.g., "Linux")',
+            'required': False,
+        }
+    )
+
+    os_distro_name_field, created = CustomField.objects.get_or_create(
+        name='os_distro_name',
+        defaults={
+            'label': 'OS Distro Name',
+            'type': 'text',
+            'description': 'OS distribution name from guestInfo.detailed.data (e.g., "ubuntu")',
+            'required': False,
+        }
+    )
+
+    os_distro_version_field, created = CustomField.objects.get_or_create(
+        name='os_distro_version',
+        defaults={
+            'label': 'OS Distro Version',
+            'type': 'text',
+            'description': 'OS distribution version from guestInfo.detailed.data (e.g., "22.04")',
+            'required': False,
+        }
+    )
+
+    os_kernel_version_field, created = CustomField.objects.get_or_create(
+        name='os_kernel_version',
+        defaults={
+            'label': 'OS Kernel Version',
+            'type': 'text',
+            'description': 'OS kernel version from guestInfo.detailed.data (e.g., "5.15.0-91-generic")',
+            'required': False,
+        }
+    )
+
+    os_bitness_field, created = CustomField.objects.get_or_create(
+        name='os_bitness',
+        defaults={
+            'label': 'OS Bitness',
+            'type': 'text',
+            'description': 'OS bitness from guestInfo.detailed.data (e.g., "64")',
+            'required': False,
+        }
+    )
+
+    creation_date_field, created = CustomField.objects.get_or_create(
+        name='creation_date',
+        defaults={
+            'label': 'Creation Date',
+            'type': 'datetime',
+            'description': 'VM creation date from config.createDate',
+            'required': False,
+        }
+    )
+
+    # Custom field для отображения связанных OBU Services
+    # Lazy import чтобы избежать циклических зависимостей
+    from .models import ObuServices
+
+    obu_services_field, created = CustomField.objects.get_or_create(
+        name='obu_services',
+        defaults={
+            'label': 'OBU Services',
+            'type': 'multiobject',
+            'description': 'Услуги, к которым привязана виртуальная машина',
+            'required': False,
+            'ui_visible': 'always',
+            'ui_editable': 'no',  # Read-only, управляется через ServiceVMAssignment
+        }
+    )
+
+    # Устанавливаем related_object_type для multiobject поля
+    # Это делается отдельно, так как это ForeignKey, а не простое поле
+    if created or not obu_services_field.related_object_type:
+        obu_services_field.related_object_type = ContentType.objects.get_for_model(ObuServices)
+        obu_services_field.save()
+
+    # Custom field-флаг: есть ли у VM хотя бы одна привязанная услуга
+    has_obu_services_field, _ = CustomField.objects.get_or_create(
+        name='has_obu_services',
+        defaults={
+            'label': 'Имеет OBU сервис',
+            'type': 'boolean',
+            'description': 'True если у виртуальной машины есть хотя бы одна привязанная услуга OBU',
+            'required': False,
+            'ui_visible': 'always',
+            'ui_editable': 'no',
+        }
+    )
+
+    # Привязываем Custom Fields к VirtualMachine
+    vm_content_type = ContentType.objects.get_for_model(VirtualMachine)
+    for field in [vcenter_id_field, last_synced_field, vcenter_cluster_field, ip_address_field,
+                  tools_status_field, vmtools_description_field, vmtools_version_number_field,
+                  os_pretty_name_field, os_family_name_field, os_distro_name_field,
+                  os_distro_version_field, os_kernel_version_field, os_bitness_field,
+                  creation_date_field, obu_services_field, has_obu_services_field]:
+        # add() идемпотентен (UNIQUE на M2M-таблице), поэтому предварительная
+        # выборка всего object_types ради проверки членства не нужна
+        field.object_types.add(vm_content_type)
+
+    return cluster_type, cluster_group, cluster_group_name
+
+
 def sync_vcenter_vms(logger=None) -> SyncResult:
     """
     Основная функция синхронизации VM из vCenter с NetBox.
@@ -701,8 +1136,8 @@ def sync_vcenter_vms(logger=None) -> SyncResult:
     try:
         if logger:
             logger.info("  → Проверка подключения к vCenter...")
-        # Проверяем подключение к vCenter
-        if not test_vcenter_connection():
+        # Проверяем подключение к vCenter (с коротким кэшем)
+        if not _cached_vcenter_available():
             result.errors.append("Не удалось подключиться к vCenter")
             if logger:
                 logger.error("  ❌ vCenter недоступен")
@@ -712,245 +1147,78 @@ def sync_vcenter_vms(logger=None) -> SyncResult:
         if logger:
             logger.info("  ✓ vCenter доступен")
 
-        # Получаем/создаем ClusterType для vCenter
-        if logger:
-            logger.info("  → Проверка ClusterType...")
-
-        cluster_type_value = get_cluster_type()
-        cluster_type_slug = cluster_type_value.lower()
-        cluster_type_name = cluster_type_value
-
-        cluster_type, created = ClusterType.objects.get_or_create(
-            slug=cluster_type_slug,
-            defaults={'name': cluster_type_name}
-        )
-
+        # Схема (ClusterType/ClusterGroup/Custom Fields) готовится один раз
+        # на процесс - повторные синхронизации не платят эти запросы
         if logger:
-            logger.info(f"  ✓ ClusterType: {cluster_type.name}")
-
-        # Получаем/создаем ClusterGroup из vcenter_name
-        if logger:
-            logger.info("  → Проверка ClusterGroup...")
-
-        cluster_group_name = get_cluster_group_name()
-
-        # Получаем vcenter_host для описания
-        from .vmware import get_plugin_config
-        config = get_plugin_config()
-        vcenter_host = config.get('vcenter_host', cluster_group_name)
-
-        cluster_group, created = ClusterGroup.objects.get_or_create(
-            name=cluster_group_name,
-            defaults={
-                'slug': cluster_group_name.replace('.', '-').replace('_', '-'),
-                'description': f'vCenter clusters from {vcenter_host}'
-            }
-        )
-
-        if logger:
-            logger.info(f"  ✓ ClusterGroup: {cluster_group.name}")
-
-        # Проверяем/создаем Custom Fields
-        if logger:
-            logger.info("  → Проверка Custom Fields...")
-
-        vcenter_id_field, created = CustomField.objects.get_or_create(
-            name='vcenter_id',
-            defaults={
-                'label': 'vCenter ID',
-                'type': 'text',
-                'description': 'Уникальный идентификатор VM в vCenter',
-                'required': False,
-            }
-        )
-
-        last_synced_field, created = CustomField.objects.get_or_create(
-            name='last_synced',
-            defaults={
-                'label': 'Last Synced',
-                'type': 'datetime',
-                'description': 'Время последней синхронизации с vCenter',
-                'required': False,
-            }
-        )
-
-        vcenter_cluster_field, created = CustomField.objects.get_or_create(
-            name='vcenter_cluster',
-            defaults={
-                'label': 'vCenter Cluster',
-                'type': 'text',
-                'description': 'Имя кластера vCenter, в котором находится ВМ',
-                'required': False,
-            }
-        )
-
-        ip_address_field, created = CustomField.objects.get_or_create(
-            name='ip_address',
-            defaults={
-                'label': 'IP Address',
-                'type': 'text',
-                'description': 'Primary IP address from vCenter (guest.ipAddress)',
-                'required': False,
-            }
-        )
-
-        tools_status_field, created = CustomField.objects.get_or_create(
-            name='tools_status',
-            defaults={
-                'label': 'VMware Tools Status',
-                'type': 'text',
-                'description': 'VMware Tools status from guest.toolsStatus',
-                'required': False,
-            }
-        )
-
-        vmtools_description_field, created = CustomField.objects.get_or_create(
-            name='vmtools_description',
-            defaults={
-                'label': 'VMware Tools Description',
-                'type': 'text',
-                'description': 'VMware Tools description from guestinfo.vmtools.description',
-                'required': False,
-            }
-        )
-
-        vmtools_version_number_field, created = CustomField.objects.get_or_create(
-            name='vmtools_version_number',
-            defaults={
-                'label': 'VMware Tools Version Number',
-                'type': 'text',
-                'description': 'VMware Tools version number from guestinfo.vmtools.versionNumber',
-                'required': False,
-            }
-        )
-
-        os_pretty_name_field, created = CustomField.objects.get_or_create(
-            name='os_pretty_name',
-            defaults={
-                'label': 'OS Pretty Name',
-                'type': 'text',
-                'description': 'OS pretty name from guestInfo.detailed.data (e.g., "Ubuntu 22.04.3 LTS")',
-                'required': False,
-            }
-        )
-
-        os_family_name_field, created = CustomField.objects.get_or_create(
-            name='os_family_name',
-            defaults={
-                'label': 'OS Family Name',
-                'type': 'text',
-                'description': 'OS family name from guestInfo.detailed.data (e.g., "Linux")',
-                'required': False,
-            }
-        )
-
-        os_distro_name_field, created = CustomField.objects.get_or_create(
-            name='os_distro_name',
-            defaults={
-                'label': 'OS Distro Name',
-                'type': 'text',
-                'description': 'OS distribution name from guestInfo.detailed.data (e.g., "ubuntu")',
-                'required': False,
-            }
-        )
-
-        os_distro_version_field, created = CustomField.objects.get_or_create(
-            name='os_distro_version',
-            defaults={
-                'label': 'OS Distro Version',
-                'type': 'text',
-                'description': 'OS distribution version from guestInfo.detailed.data (e.g., "22.04")',
-                'required': False,
-            }
-        )
-
-        os_kernel_version_field, created = CustomField.objects.get_or_create(
-            name='os_kernel_version',
-            defaults={
-                'label': 'OS Kernel Version',
-                'type': 'text',
-                'description': 'OS kernel version from guestInfo.detailed.data (e.g., "5.15.0-91-generic")',
-                'required': False,
-            }
-        )
-
-        os_bitness_field, created = CustomField.objects.get_or_create(
-            name='os_bitness',
-            defaults={
-                'label': 'OS Bitness',
-                'type': 'text',
-                'description': 'OS bitness from guestInfo.detailed.data (e.g., "64")',
-                'required': False,
-            }
-        )
-
-        creation_date_field, created = CustomField.objects.get_or_create(
-            name='creation_date',
-            defaults={
-                'label': 'Creation Date',
-                'type': 'datetime',
-                'description': 'VM creation date from config.createDate',
-                'required': False,
-            }
-        )
+            logger.info("  → Подготовка ClusterType/ClusterGroup/Custom Fields...")
 
-        # Custom field для отображения связанных OBU Services
-        # Lazy import чтобы избежать циклических зависимостей
-        from .models import ObuServices
-
-        obu_services_field, created = CustomField.objects.get_or_create(
-            name='obu_services',
-            defaults={
-                'label': 'OBU Services',
-                'type': 'multiobject',
-                'description': 'Услуги, к которым привязана виртуальная машина',
-                'required': False,
-                'ui_visible': 'always',
-                'ui_editable': 'no',  # Read-only, управляется через ServiceVMAssignment
-            }
-        )
-
-        # Устанавливаем related_object_type для multiobject поля
-        # Это делается отдельно, так как это ForeignKey, а не простое поле
-        if created or not obu_services_field.related_object_type:
-            obu_services_field.related_object_type = ContentType.objects.get_for_model(ObuServices)
-            obu_services_field.save()
-
-        # Custom field-флаг: есть ли у VM хотя бы одна привязанная услуга
-        has_obu_services_field, _ = CustomField.objects.get_or_create(
-            name='has_obu_services',
-            defaults={
-                'label': 'Имеет OBU сервис',
-                'type': 'boolean',
-                'description': 'True если у виртуальной машины есть хотя бы одна привязанная услуга OBU',
-                'required': False,
-                'ui_visible': 'always',
-                'ui_editable': 'no',
-            }
-        )
-
-        # Привязываем Custom Fields к VirtualMachine
-        vm_content_type = ContentType.objects.get_for_model(VirtualMachine)
-        for field in [vcenter_id_field, last_synced_field, vcenter_cluster_field, ip_address_field,
-                      tools_status_field, vmtools_description_field, vmtools_version_number_field,
-                      os_pretty_name_field, os_family_name_field, os_distro_name_field,
-                      os_distro_version_field, os_kernel_version_field, os_bitness_field,
-                      creation_date_field, obu_services_field, has_obu_services_field]:
-            if vm_content_type not in field.object_types.all():
-                field.object_types.add(vm_content_type)
+        cluster_type, cluster_group, cluster_group_name = _bootstrap_sync_schema()
 
         if logger:
-            logger.info("  ✓ Custom Fields готовы")
+            logger.info(f"  ✓ ClusterType: {cluster_type.name}, ClusterGroup: {cluster_group.name}")
 
-        # Получаем VM из vCenter
+        # Получаем VM из vCenter и существующие VM из NetBox параллельно:
+        # первый запрос — сетевой I/O к vCenter, второй — I/O к БД,
+        # оба отпускают GIL, поэтому время фазы ≈ max, а не сумма
         if logger:
-            logger.info("  → Получение VM из vCenter...")
-
-        vcenter_vms = get_vcenter_vms()
+            logger.info("  → Параллельный запрос VM из vCenter и NetBox...")
+
+        def _fetch_existing_vms():
+            # Сознательно материализуем модельные объекты, а не
+            # values_list(named=True): фаза применения обновляет эти же
+            # экземпляры через bulk_update с дозаписью в JSON-поле
+            # custom_field_data, и namedtuple пришлось бы конвертировать
+            # обратно в VirtualMachine(pk=...) с потерей прочитанного JSON.
+            # Стоимость инстанцирования уже срезана проекцией .only() ниже.
+            # Выделенное соединение с БД в рабочем потоке.
+            # dict(zip(map(...))) строит словарь целиком на C-уровне -
+            # заметно дешевле Python-цикла dict comprehension на десятках
+            # тысяч строк (публичного способа задать начальный размер
+            # словаря в CPython нет)
+            try:
+                # Диффу и фазе применения нужны только эти поля (плюс имя
+                # кластера), поэтому проецируем колонки через .only() и
+                # читаем серверным курсором вместо одномоментной выборки
+                vms = list(
+                    VirtualMachine.objects
+                    .select_related('cluster')
+                    .only('id', 'name', 'status', 'vcpus', 'memory',
+                          'custom_field_data', 'cluster__name')
+                    .iterator(chunk_size=2000)
+                )
+                # in_bulk(field_name='name') здесь не подходит: NetBox не
+                # объявляет VirtualMachine.name уникальным (уникальность
+                # только в связке с кластером/тенантом), а in_bulk требует
+                # unique=True и падает с ValueError
+                return dict(zip(map(attrgetter('name'), vms), vms))
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # refresh=True: задача синхронизации обязана видеть живые данные
+            # vCenter - TTL-кэш предназначен для статусных/ad-hoc потребителей
+            future_vcenter = executor.submit(get_vcenter_vms, refresh=True)
+            future_existing = executor.submit(_fetch_existing_vms)
+            vcenter_vms = future_vcenter.result()
+            existing_vms = future_existing.result()
 
         if logger:
             logger.info(f"  ✓ Получено {len(vcenter_vms)} VM из vCenter")
 
+        # Если данные vCenter байт-в-байт совпадают с последним успешным
+        # прогоном, дифф и применение можно пропустить целиком - это
+        # устойчивое состояние для большинства плановых запусков.
+        # Внимание: ручные правки на стороне NetBox при совпадении хэша
+        # будут исправлены только после изменения данных в vCenter
+        payload_hash = _payload_hash(vcenter_vms)
+        if payload_hash == cache.get(PAYLOAD_HASH_CACHE_KEY):
+            result.unchanged = len(vcenter_vms)
+            result.total_processed = len(vcenter_vms)
+            if logger:
+                logger.info("  ✓ Данные vCenter не изменились - синхронизация пропущена")
+            result.finish()
+            return result
+
         # Регистрируем новые версии ОС в реестре OperatingSystem (для отслеживания EOL).
         # Вспомогательная операция: её сбой не должен прерывать синхронизацию ВМ.
         try:
@@ -974,16 +1242,8 @@ def sync_vcenter_vms(logger=None) -> SyncResult:
             if logger:
                 logger.warning(f"  ⚠ Не удалось обновить реестр версий ОС: {e}")
 
-        # Получаем ВСЕ существующие VM (из любых кластеров)
-        # Включая старый vcenter_obu - они автоматически переместятся при обновлении
-        if logger:
-            logger.info("  → Запрос существующих VM из NetBox...")
-
-        existing_vms = {
-            vm.name: vm
-            for vm in VirtualMachine.objects.all()
-        }
-
+        # existing_vms содержит ВСЕ существующие VM (из любых кластеров),
+        # включая старый vcenter_obu - они автоматически переместятся при обновлении
         if logger:
             logger.info(f"  ✓ Найдено {len(existing_vms)} VM в NetBox")
         
@@ -1034,7 +1294,12 @@ def sync_vcenter_vms(logger=None) -> SyncResult:
         result.errors.append(f"Ошибка применения изменений: {str(e)}")
         if logger:
             logger.error(f"  ❌ {str(e)}")
-    
+
+    # Хэш сохраняем только после успешного применения - при ошибках
+    # следующий прогон должен пройти полный цикл
+    if not result.errors:
+        cache.set(PAYLOAD_HASH_CACHE_KEY, payload_hash, None)
+
     result.finish()
     return result
 
@@ -1043,6 +1308,10 @@ def get_sync_status(cluster_group_name: str = None) -> Dict:
     """
     Возвращает текущий статус синхронизации для ClusterGroup.
 
+    Результат кэшируется на несколько секунд: дашборд опрашивает статус
+    чаще, чем данные реально меняются, и повторные запросы обслуживаются
+    из кэша без похода в БД. Кэш сбрасывается по завершении VCenterSyncJob.
+
     Args:
         cluster_group_name: Имя ClusterGroup (по умолчанию из vcenter_host)
 
@@ -1060,17 +1329,33 @@ def get_sync_status(cluster_group_name: str = None) -> Dict:
         >>> status = get_sync_status()
         >>> print(f"Всего VM: {status['total_vms']}, Кластеров: {status['cluster_count']}")
     """
+    cache_key = SYNC_STATUS_CACHE_KEY
+    if cluster_group_name is not None:
+        cache_key = f'{SYNC_STATUS_CACHE_KEY}:{cluster_group_name}'
+
+    return cache.get_or_set(
+        cache_key,
+        lambda: _compute_sync_status(cluster_group_name),
+        timeout=5,
+    )
+
+
+def _compute_sync_status(cluster_group_name: str = None) -> Dict:
+    """Собирает статус синхронизации из БД (см. get_sync_status)"""
     try:
         if cluster_group_name is None:
             cluster_group_name = get_cluster_group_name()
 
         cluster_group = ClusterGroup.objects.get(name=cluster_group_name)
-        vms = VirtualMachine.objects.filter(cluster__group=cluster_group)
 
-        total_vms = vms.count()
-        active_vms = vms.filter(status='active').count()
-        offline_vms = vms.filter(status='offline').count()
-        failed_vms = vms.filter(status='failed').count()
+        # Все счетчики VM собираются одним агрегатным запросом с
+        # фильтрованными Count вместо четырех отдельных COUNT(*)
+        agg = VirtualMachine.objects.filter(cluster__group=cluster_group).aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            offline=Count('id', filter=Q(status='offline')),
+            failed=Count('id', filter=Q(status='failed')),
+        )
         cluster_count = Cluster.objects.filter(group=cluster_group).count()
 
         # Получаем время последней успешной синхронизации из таблицы Job
@@ -1084,11 +1369,11 @@ def get_sync_status(cluster_group_name: str = None) -> Dict:
         last_sync = last_job.completed if last_job else None
 
         return {
-            'total_vms': total_vms,
-            'active_vms': active_vms,
-            'offline_vms': offline_vms,
-            'failed_vms': failed_vms,
-            'vcenter_available': test_vcenter_connection(),
+            'total_vms': agg['total'],
+            'active_vms': agg['active'],
+            'offline_vms': agg['offline'],
+            'failed_vms': agg['failed'],
+            'vcenter_available': _cached_vcenter_available(),
             'last_sync': last_sync,
             'cluster_count': cluster_count,
         }
@@ -1098,7 +1383,7 @@ def get_sync_status(cluster_group_name: str = None) -> Dict:
             'active_vms': 0,
             'offline_vms': 0,
             'failed_vms': 0,
-            'vcenter_available': test_vcenter_connection(),
+            'vcenter_available': _cached_vcenter_available(),
             'last_sync': None,
             'cluster_count': 0,
         }
@@ -1169,3 +1454,210 @@ def sync_cluster_to_service(service_id: int, cluster_id: int, logger=None) -> Di
             logger.warning(f"  ⚠️ Ошибок: {len(result['errors'])}")
 
     return result
+
+
+def _bulk_update_vms(vms, fields, batch_size=1000):
+    """
+    Пакетное обновление VM: fast_update если установлен, иначе bulk_update.
+
+    Args:
+        vms: Список измененных VirtualMachine
+        fields: Список полей для записи
+        batch_size: Размер пакета
+    """
+    if _fast_update is not None:
+        _fast_update(VirtualMachine.objects.all(), vms, fields, batch_size)
+    else:
+        VirtualMachine.objects.bulk_update(vms, fields, batch_size=batch_size)
+
+
+# Идентификатор advisory-блокировки ресинка custom fields (произвольная
+# константа, уникальная в рамках инсталляции)
+_CF_SYNC_LOCK_ID = 788529
+
+
+def _try_cf_sync_lock() -> bool:
+    """
+    Пытается взять сессионную advisory-блокировку ресинка (PostgreSQL).
+
+    Сессионная блокировка переживает границы транзакций, поэтому
+    сочетается с по-чанковыми commit'ами ресинка. На других СУБД
+    блокировка не поддерживается и считается взятой.
+    """
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [_CF_SYNC_LOCK_ID])
+        return cursor.fetchone()[0]
+
+
+def _release_cf_sync_lock():
+    """Освобождает advisory-блокировку ресинка (PostgreSQL)"""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", [_CF_SYNC_LOCK_ID])
+
+
+def sync_services_custom_fields(logger=None) -> Dict:
+    """
+    Ресинхронизация custom field obu_services, tenant и role для всех VM.
+
+    Обновляет custom field 'obu_services' и tenant/role для всех VM с
+    привязанными услугами и сбрасывает флаг has_obu_services у остальных.
+    Используется для первичной инициализации после деплоя или ресинхронизации.
+
+    Одновременно выполняется не более одного ресинка: защищено advisory-
+    блокировкой PostgreSQL, при занятой блокировке возвращается ошибка.
+
+    Args:
+        logger: Опциональный logger для фоновых задач (JobRunner.logger)
+
+    Returns:
+        Dict с ключами: updated_cf (int), updated_tenant (int),
+        updated_flag (int) и, при занятой блокировке, error (str)
+    """
+    if not _try_cf_sync_lock():
+        msg = "Ресинхронизация custom fields уже выполняется другим процессом"
+        if logger:
+            logger.warning(f"  ⚠️ {msg}")
+        return {'updated_cf': 0, 'updated_tenant': 0, 'updated_flag': 0, 'error': msg}
+
+    try:
+        return _sync_services_custom_fields(logger=logger)
+    finally:
+        _release_cf_sync_lock()
+
+
+def _sync_services_custom_fields(logger=None) -> Dict:
+    """Тело ресинка custom fields (см. sync_services_custom_fields)"""
+    from .models import ServiceVMAssignment
+
+    # Принадлежность «у VM есть услуги» проверяется EXISTS-подзапросом:
+    # полу-join на стороне БД вместо материализации множества id в Python
+    # и без DISTINCT-прохода
+    has_services = Exists(
+        ServiceVMAssignment.objects.filter(virtual_machine=OuterRef('pk'))
+    )
+
+    updated_cf = 0
+    updated_tenant = 0
+    updated_flag = 0
+
+    if logger:
+        logger.info("  → Обновление custom fields для VM с услугами...")
+
+    # Обновляем VM с сервисами. Все привязки с услугами, тенантами
+    # и ролями вытягиваются заранее двумя запросами (prefetch +
+    # select_related), а выбор service_ids/tenant/role делается
+    # по закэшированному списку - без запросов внутри цикла
+    vms_with = (
+        VirtualMachine.objects
+        .filter(has_services)
+        .prefetch_related(
+            Prefetch(
+                'service_assignments',
+                queryset=ServiceVMAssignment.objects
+                .select_related('service__tenant', 'service__vm_role')
+                .order_by('service_id'),
+            )
+        )
+    )
+
+    def _flush(batch, fields):
+        """Пишет накопленный пакет и очищает его"""
+        if batch:
+            with transaction.atomic():
+                _bulk_update_vms(batch, fields)
+            batch.clear()
+
+    # Серверный курсор + пакеты фиксированного размера: пиковая память
+    # O(chunk_size), а не O(всех VM); prefetch выполняется по-чанково
+    modified = []
+    # tenant/role-only изменения: (tenant_id, role_id) → [vm_id, ...]
+    tenant_role_groups = {}
+    for vm in vms_with.iterator(chunk_size=1000):
+        assignments = list(vm.service_assignments.all())
+        service_ids = [a.service_id for a in assignments]
+
+        new_tenant = next(
+            (a.service.tenant for a in assignments if a.service.tenant_id is not None),
+            None,
+        )
+        new_role = next(
+            (a.service.vm_role for a in assignments if a.service.vm_role_id is not None),
+            None,
+        )
+
+        updated_cf += 1
+        updated_flag += 1
+        if new_tenant is not None:
+            updated_tenant += 1
+
+        # Если JSON-поле уже в актуальном состоянии, перезаписывать его не
+        # нужно: совсем неизмененные VM пропускаем, а tenant/role-only
+        # изменения группируем для точечных UPDATE ниже
+        if (vm.custom_field_data.get('obu_services') == service_ids
+                and vm.custom_field_data.get('has_obu_services') is True):
+            new_tenant_id = new_tenant.pk if new_tenant else None
+            new_role_id = new_role.pk if new_role else None
+            if vm.tenant_id != new_tenant_id or vm.role_id != new_role_id:
+                tenant_role_groups.setdefault((new_tenant_id, new_role_id), []).append(vm.pk)
+            continue
+
+        vm.custom_field_data['obu_services'] = service_ids
+        vm.custom_field_data['has_obu_services'] = True
+        vm.tenant = new_tenant
+        vm.role = new_role
+        modified.append(vm)
+
+        # Пакетная запись вместо save() на каждую VM: ⌈N/1000⌉ запросов
+        # вместо N. ObjectChange записи при этом не создаются - как и в
+        # синхронизации с vCenter, для массового ресинка это осознанный
+        # компромисс
+        if len(modified) >= 1000:
+            _flush(modified, ['custom_field_data', 'tenant', 'role'])
+            if logger:
+                logger.info(f"    ✓ Обновлено: {updated_cf} VM...")
+
+    _flush(modified, ['custom_field_data', 'tenant', 'role'])
+
+    # Точечные UPDATE для VM, у которых менялись только tenant/role:
+    # одна команда на целевую пару значений вместо перегонки JSON-поля
+    # через bulk_update
+    for (tenant_id, role_id), vm_ids in tenant_role_groups.items():
+        with transaction.atomic():
+            VirtualMachine.objects.filter(pk__in=vm_ids).update(
+                tenant_id=tenant_id,
+                role_id=role_id,
+            )
+
+    # Сбрасываем has_obu_services у VM без сервисов (тоже по-чанково)
+    without = []
+    for vm in (
+        VirtualMachine.objects
+        .filter(~has_services)
+        .only('id', 'custom_field_data')
+        .iterator(chunk_size=1000)
+    ):
+        vm.custom_field_data['has_obu_services'] = False
+        updated_flag += 1
+        without.append(vm)
+
+        if len(without) >= 1000:
+            _flush(without, ['custom_field_data'])
+
+    _flush(without, ['custom_field_data'])
+
+    if logger:
+        logger.info(
+            f"  ✓ Обновлено: {updated_cf} VM с obu_services, "
+            f"{updated_tenant} VM с tenant, "
+            f"{updated_flag} VM с флагом has_obu_services"
+        )
+
+    return {
+        'updated_cf': updated_cf,
+        'updated_tenant': updated_tenant,
+        'updated_flag': updated_flag,
+    }
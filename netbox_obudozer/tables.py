@@ -34,6 +34,8 @@ class ObuServicesTable(NetBoxTable):
         verbose_name='Описание'
     )
 
+    # Денормализованная колонка модели (поддерживается сигналами на
+    # ServiceVMAssignment): список читает готовое значение без JOIN/GROUP BY
     vm_count = tables.Column(
         verbose_name='Количество VM',
     )
@@ -107,4 +109,3 @@ class OperatingSystemTable(NetBoxTable):
         model = OperatingSystem
         fields = ('name', 'eol_date', 'eol_status', 'vm_count', 'created', 'last_updated')
         default_columns = ('name', 'eol_date', 'eol_status', 'vm_count')
-
@@ -11,6 +11,9 @@ urlpatterns = [
     # Синхронизация с vCenter
     path('sync-vcenter/', views.sync_vcenter_view, name='sync_vcenter'),
 
+    # SSE-поток прогресса синхронизации
+    path('sync-vcenter/events/', views.sync_vcenter_events_view, name='sync_vcenter_events'),
+
     # Синхронизация custom field obu_services
     path('sync-services-cf/', views.sync_services_cf_view, name='sync_services_cf'),
 
@@ -3,11 +3,20 @@ Views (представления) плагина netbox_obudozer
 
 Содержит функцию синхронизации с vCenter и полный CRUD для услуг OBU.
 """
+import json
+import time
+import traceback
+from collections import defaultdict
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import permission_required
-from django.http import JsonResponse
-from django.db.models import Count, Sum
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db.models import Prefetch, Q, Sum
+from virtualization.models import VirtualDisk, VirtualMachine
 
 from netbox.views.generic import (
     ObjectListView,
@@ -19,13 +28,50 @@ from netbox.views.generic import (
 )
 from utilities.views import register_model_view
 
-from .sync import get_sync_status
-from .jobs import VCenterSyncJob
-from .models import ObuServices, NginxDomain, OperatingSystem
+from .sync import get_sync_status, publish_sync_progress, SYNC_PROGRESS_CACHE_KEY
+from .jobs import VCenterSyncJob, ServicesCFSyncJob
+from .models import ObuServices, ServiceVMAssignment, NginxDomain, OperatingSystem
 from .tables import ObuServicesTable, NginxDomainTable, OperatingSystemTable
 from .forms import ObuServicesForm, ObuServicesBulkEditForm, NginxDomainForm, NginxDomainFilterForm, OperatingSystemForm, OperatingSystemFilterForm
 from .filtersets import ObuServicesFilterSet, NginxDomainFilterSet, OperatingSystemFilterSet
 
+# Опциональное ускорение сериализации JSON: orjson кодирует объекты
+# в 3-5 раз быстрее stdlib json и сразу отдает bytes. При отсутствии
+# пакета остается стандартный JsonResponse.
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _json(data, status=200):
+    """
+    Собирает JSON-ответ через orjson (если установлен) или JsonResponse.
+
+    Args:
+        data: Сериализуемый объект (dict)
+        status: HTTP-код ответа
+
+    Returns:
+        HttpResponse с content-type application/json
+    """
+    if _orjson is not None:
+        return HttpResponse(
+            _orjson.dumps(data),
+            content_type='application/json',
+            status=status,
+        )
+    return JsonResponse(data, status=status)
+
+
+# Шаблоны сообщений горячих JSON-ответов: строка-шаблон собирается один раз
+# при импорте модуля, на запросе остается только подстановка
+SYNC_ENQUEUED_MESSAGE = 'Задача синхронизации #{} поставлена в очередь'
+CF_SYNC_ENQUEUED_MESSAGE = (
+    'Ресинхронизация custom fields запущена (задача #{}). '
+    'Прогресс доступен на странице задачи.'
+)
+
 
 @permission_required('netbox_obudozer.view_vcentersyncaccess')
 def sync_vcenter_view(request):
@@ -42,24 +88,29 @@ def sync_vcenter_view(request):
         HttpResponse или JsonResponse
     """
     if request.method == 'POST':
+        # try охватывает только сам enqueue: сборка ответа не должна
+        # маскироваться под ошибку постановки в очередь
         try:
-            # Ставим задачу в очередь
             job = VCenterSyncJob.enqueue()
-
-            # Возвращаем JSON с ID задачи
-            return JsonResponse({
-                'success': True,
-                'job_id': job.pk,
-                'message': f'Задача синхронизации #{job.pk} поставлена в очередь'
-            })
-
         except Exception as e:
             # Критическая ошибка постановки в очередь
-            return JsonResponse({
+            return _json({
                 'success': False,
                 'error': str(e)
             }, status=500)
 
+        # Сбрасываем прогресс предыдущего прогона: запись живет в кэше час,
+        # и без этого EventSource нового прогона сразу прочитал бы старый
+        # терминальный payload и закрыл поток, пока задача еще в очереди
+        publish_sync_progress('pending', f'Задача #{job.pk} поставлена в очередь')
+
+        # Возвращаем JSON с ID задачи
+        return _json({
+            'success': True,
+            'job_id': job.pk,
+            'message': SYNC_ENQUEUED_MESSAGE.format(job.pk)
+        })
+
     # GET запрос - показываем статус синхронизации
     sync_status = get_sync_status()
 
@@ -68,98 +119,76 @@ def sync_vcenter_view(request):
     })
 
 
+@permission_required('netbox_obudozer.view_vcentersyncaccess')
+def sync_vcenter_events_view(request):
+    """
+    SSE-поток (Server-Sent Events) прогресса синхронизации vCenter.
+
+    Вместо того чтобы каждый открытый дашборд опрашивал sync_vcenter_view
+    (и тем самым БД), браузер подписывается через EventSource, а сервер
+    читает состояние из кэша, куда его публикует VCenterSyncJob. Нагрузка
+    на БД не зависит от числа подписчиков.
+
+    Args:
+        request: HTTP request объект
+
+    Returns:
+        StreamingHttpResponse с content-type text/event-stream
+    """
+    def event_stream():
+        last_payload = None
+        # Поток живет ограниченное время - EventSource в браузере
+        # переподключается автоматически
+        for _ in range(120):
+            payload = cache.get(SYNC_PROGRESS_CACHE_KEY)
+            if payload is not None and payload != last_payload:
+                yield f"data: {json.dumps(payload, default=str)}\n\n"
+                last_payload = payload
+                if payload.get('status') in ('completed', 'errored'):
+                    return
+            else:
+                # Комментарий-keep-alive, чтобы прокси не закрывал соединение
+                yield ": keep-alive\n\n"
+            time.sleep(1)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: не буферизовать поток
+    return response
+
+
 @permission_required('virtualization.view_virtualmachine')
 def sync_services_cf_view(request):
     """
-    View для синхронизации custom field obu_services и tenant.
+    View для запуска ресинхронизации custom field obu_services и tenant.
 
-    Обновляет custom field 'obu_services' и tenant для всех VM с привязанными сервисами.
-    Используется для первичной инициализации после деплоя или ресинхронизации.
+    Сама работа (обход всех VM + пакетные записи) выполняется в фоновой
+    задаче ServicesCFSyncJob - при тысячах VM синхронное выполнение внутри
+    HTTP-запроса удерживало воркер и упиралось в таймауты прокси.
 
-    POST: Выполняет синхронизацию и возвращает JSON с результатом
+    POST: Ставит задачу в очередь и возвращает JSON с job_id
 
     Args:
         request: HTTP request объект
 
     Returns:
-        JsonResponse с результатом синхронизации
+        JsonResponse с job_id поставленной задачи
     """
     if request.method == 'POST':
         try:
-            from virtualization.models import VirtualMachine
-            from .models import ServiceVMAssignment, ObuServices
-
-            # Собираем ID всех VM, у которых есть assignments
-            vms_with_services_ids = set(
-                ServiceVMAssignment.objects.values_list('virtual_machine_id', flat=True).distinct()
-            )
-
-            updated_cf = 0
-            updated_tenant = 0
-            updated_flag = 0
-
-            # Обновляем VM с сервисами
-            vms_with = VirtualMachine.objects.filter(id__in=vms_with_services_ids)
-            for vm in vms_with:
-                service_ids = list(
-                    vm.service_assignments.values_list('service_id', flat=True)
-                    .order_by('service_id')
-                )
-                vm.custom_field_data['obu_services'] = service_ids
-                vm.custom_field_data['has_obu_services'] = True
-                updated_cf += 1
-                updated_flag += 1
-
-                first_service_with_tenant = (
-                    vm.service_assignments
-                    .filter(service__tenant__isnull=False)
-                    .select_related('service__tenant')
-                    .first()
-                )
-                if first_service_with_tenant:
-                    vm.tenant = first_service_with_tenant.service.tenant
-                    updated_tenant += 1
-                else:
-                    vm.tenant = None
-
-                first_service_with_role = (
-                    vm.service_assignments
-                    .filter(service__vm_role__isnull=False)
-                    .select_related('service__vm_role')
-                    .first()
-                )
-                if first_service_with_role:
-                    vm.role = first_service_with_role.service.vm_role
-                else:
-                    vm.role = None
-
-                vm.save()
-
-            # Сбрасываем has_obu_services у VM без сервисов
-            vms_without = VirtualMachine.objects.exclude(id__in=vms_with_services_ids)
-            for vm in vms_without:
-                vm.custom_field_data['has_obu_services'] = False
-                vm.save()
-                updated_flag += 1
-
-            return JsonResponse({
-                'success': True,
-                'updated_cf': updated_cf,
-                'updated_tenant': updated_tenant,
-                'updated_flag': updated_flag,
-                'message': (
-                    f'Обновлено: {updated_cf} VM с obu_services, '
-                    f'{updated_tenant} VM с tenant, '
-                    f'{updated_flag} VM с флагом has_obu_services'
-                )
-            })
-
+            job = ServicesCFSyncJob.enqueue()
         except Exception as e:
             return JsonResponse({
                 'success': False,
                 'error': str(e)
             }, status=500)
 
+        return JsonResponse({
+            'success': True,
+            'job_id': job.pk,
+            'message': CF_SYNC_ENQUEUED_MESSAGE.format(job.pk)
+        })
+
     # GET не поддерживается
     return JsonResponse({'error': 'Method not allowed'}, status=405)
 
@@ -172,9 +201,6 @@ def test_gitlab_connection_view(request):
     """
     if request.method == 'POST':
         try:
-            from django.conf import settings
-            import requests as req
-
             config = settings.PLUGINS_CONFIG.get('netbox_obudozer', {})
             gitlab_url = config.get('gitlab_url', '').rstrip('/')
             gitlab_token = config.get('gitlab_token', '')
@@ -192,7 +218,7 @@ def test_gitlab_connection_view(request):
             kwargs = {'headers': headers, 'timeout': 10, 'verify': verify_ssl}
 
             # Проверяем сам токен
-            token_resp = req.get(f'{gitlab_url}/api/v4/personal_access_tokens/self', **kwargs)
+            token_resp = requests.get(f'{gitlab_url}/api/v4/personal_access_tokens/self', **kwargs)
             if token_resp.status_code == 401:
                 messages.error(request, 'GitLab: неверный токен (HTTP 401 Unauthorized)')
                 return redirect('plugins:netbox_obudozer:sync_vcenter')
@@ -209,7 +235,7 @@ def test_gitlab_connection_view(request):
             # Проверяем каждый репозиторий
             for project_id in gitlab_projects:
                 project_id_encoded = str(project_id).replace('/', '%2F')
-                proj_resp = req.get(f'{gitlab_url}/api/v4/projects/{project_id_encoded}', **kwargs)
+                proj_resp = requests.get(f'{gitlab_url}/api/v4/projects/{project_id_encoded}', **kwargs)
 
                 if proj_resp.status_code != 200:
                     messages.error(request, f'GitLab [{project_id}]: недоступен (HTTP {proj_resp.status_code})')
@@ -243,15 +269,13 @@ def gitlab_debug_view(request):
 
     if request.method == 'POST':
         try:
-            from collections import defaultdict
             from .gitlab_client import fetch_nginx_configs
             from .nginx_parser import parse_configs
 
             configs_raw, project_reports = fetch_nginx_configs()
             resolutions = parse_configs(configs_raw)
 
-            from django.conf import settings as _settings
-            waf_ips = set(_settings.PLUGINS_CONFIG.get('netbox_obudozer', {}).get('waf_ips', []))
+            waf_ips = set(settings.PLUGINS_CONFIG.get('netbox_obudozer', {}).get('waf_ips', []))
 
             # Обогащаем каждый результат: строим targets_display для каждого backend
             processed = []
@@ -345,7 +369,6 @@ def gitlab_debug_view(request):
             domain_table = sorted(domain_rows.values(), key=lambda x: x['domain'])
 
         except Exception as e:
-            import traceback
             error = f'{e}\n\n{traceback.format_exc()}'
 
     return render(request, 'netbox_obudozer/gitlab_debug.html', {
@@ -369,9 +392,9 @@ class ObuServicesListView(ObjectListView):
     - Экспорт данных
     - Кнопки действий (Create, Edit, Delete, BulkEdit, BulkDelete)
     """
-    queryset = ObuServices.objects.annotate(
-        vm_count=Count('vm_assignments')
-    )
+    # vm_count - денормализованная колонка модели (поддерживается сигналами),
+    # поэтому списку не нужны ни аннотация, ни GROUP BY
+    queryset = ObuServices.objects.all()
     table = ObuServicesTable
     filterset = ObuServicesFilterSet
 
@@ -384,21 +407,34 @@ class ObuServicesDetailView(ObjectView):
     Отображает полную информацию о конкретной услуге,
     включая пользовательские поля и теги.
     """
-    queryset = ObuServices.objects.all()
+    # Привязки с VM и кластерами подтягиваются вместе с объектом; таблица
+    # VM и счетчик в шаблоне читают уже загруженный кэш prefetch без
+    # дополнительных запросов
+    queryset = ObuServices.objects.prefetch_related(
+        Prefetch(
+            'vm_assignments',
+            queryset=ServiceVMAssignment.objects.select_related('virtual_machine__cluster'),
+        )
+    )
 
     def get_extra_context(self, request, instance):
-        from virtualization.models import VirtualMachine
-        from .models import ServiceVMAssignment
-
-        vm_ids = ServiceVMAssignment.objects.filter(service=instance).values_list('virtual_machine_id', flat=True)
-        active_vm_ids = VirtualMachine.objects.filter(id__in=vm_ids, status='active').values_list('id', flat=True)
-        totals = VirtualMachine.objects.filter(id__in=active_vm_ids).aggregate(
+        # Кэш prefetch уже наполнен - len()/итерация не ходят в БД
+        vm_assignments = list(instance.vm_assignments.all())
+
+        # Агрегируем через join по связи, а не через вложенные id__in
+        # подзапросы - БД выполняет полу-join без промежуточных списков id
+        totals = VirtualMachine.objects.filter(
+            service_assignments__service=instance,
+            status='active',
+        ).aggregate(
             total_vcpus=Sum('vcpus'),
             total_memory=Sum('memory'),
         )
 
-        from virtualization.models import VirtualDisk
-        disk_sum = VirtualDisk.objects.filter(virtual_machine_id__in=active_vm_ids).aggregate(total=Sum('size'))
+        disk_sum = VirtualDisk.objects.filter(
+            virtual_machine__service_assignments__service=instance,
+            virtual_machine__status='active',
+        ).aggregate(total=Sum('size'))
         total_disk_mb = disk_sum['total'] or 0
 
         def fmt_memory(mb):
@@ -418,6 +454,8 @@ class ObuServicesDetailView(ObjectView):
             return f"{mb} МБ"
 
         return {
+            'vm_assignments': vm_assignments,
+            'vm_count': len(vm_assignments),
             'total_vcpus': int(totals['total_vcpus'] or 0),
             'total_memory': fmt_memory(totals['total_memory'] or 0),
             'total_disk': fmt_disk(total_disk_mb),
@@ -477,7 +515,11 @@ class ObuServicesBulkDeleteView(BulkDeleteView):
 
 @register_model_view(NginxDomain, 'list', detail=False)
 class NginxDomainListView(ObjectListView):
-    queryset = NginxDomain.objects.all()
+    # .only() сужает SELECT до колонок, которые реально рендерит таблица:
+    # меньше ширина строки - меньше сетевой трафик PostgreSQL на страницу
+    queryset = NginxDomain.objects.only(
+        'id', 'domain', 'custom_field_data', 'last_updated',
+    )
     table = NginxDomainTable
     filterset = NginxDomainFilterSet
     filterset_form = NginxDomainFilterForm
@@ -521,7 +563,6 @@ def import_nginx_domains_view(request):
             'errors': result['errors'],
         })
     except Exception as e:
-        import traceback
         return JsonResponse({'success': False, 'error': str(e), 'traceback': traceback.format_exc()}, status=500)
 
 
@@ -531,7 +572,11 @@ def import_nginx_domains_view(request):
 
 @register_model_view(OperatingSystem, 'list', detail=False)
 class OperatingSystemListView(ObjectListView):
-    queryset = OperatingSystem.objects.all()
+    # Таблице нужны только name/eol_date и даты аудита
+    # (eol_status и vm_count - свойства модели поверх этих полей)
+    queryset = OperatingSystem.objects.only(
+        'id', 'name', 'eol_date', 'created', 'last_updated',
+    )
     table = OperatingSystemTable
     filterset = OperatingSystemFilterSet
     filterset_form = OperatingSystemFilterForm
@@ -542,7 +587,6 @@ class OperatingSystemDetailView(ObjectView):
     queryset = OperatingSystem.objects.all()
 
     def get_extra_context(self, request, instance):
-        from virtualization.models import VirtualMachine
         vms = VirtualMachine.objects.filter(custom_field_data__os_pretty_name=instance.name)
         return {'vms': vms}
 
@@ -574,8 +618,6 @@ def eol_dashboard_view(request):
     зарегистрирована в реестре OperatingSystem с датой окончания поддержки
     в прошлом ('expired') либо в ближайшие eol_warning_days дней ('soon').
     """
-    from virtualization.models import VirtualMachine
-
     tracked = [
         os for os in OperatingSystem.objects.exclude(eol_date__isnull=True)
         if os.eol_status in ('expired', 'soon')
@@ -586,7 +628,6 @@ def eol_dashboard_view(request):
     if os_by_name:
         # OR из экзакт-матчей по ключу JSONField (надёжнее, чем __in по key-transform),
         # остаётся одним SQL-запросом
-        from django.db.models import Q
         q = Q()
         for name in os_by_name:
             q |= Q(custom_field_data__os_pretty_name=name)
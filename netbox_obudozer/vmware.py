@@ -4,26 +4,37 @@
 Содержит функции для получения данных о виртуальных машинах из vCenter.
 Использует библиотеку pyVmomi для подключения к vCenter API.
 """
-from typing import List, Dict
+from typing import Dict, Iterator, List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 import logging
 import atexit
+import re
+import sys
+import threading
+import time
 
+from django.conf import settings
 from pyVim.connect import SmartConnect, Disconnect
 from pyVmomi import vim, vmodl
-from tqdm import tqdm
 
 # Настройка логирования
 logger = logging.getLogger('netbox.plugins.netbox_obudozer')
 
 
+@lru_cache(maxsize=1)
 def get_plugin_config():
     """
     Получает конфигурацию плагина из settings.
 
+    Результат кэшируется на время жизни процесса: PLUGINS_CONFIG меняется
+    только с рестартом, а обращение через LazySettings.__getattr__
+    не бесплатно и выполнялось на каждое подключение к vCenter.
+
     Returns:
         dict: Словарь с настройками плагина
     """
-    from django.conf import settings
     return settings.PLUGINS_CONFIG.get('netbox_obudozer', {})
 
 
@@ -78,7 +89,8 @@ def _connect_vcenter():
     password = config.get('vcenter_password')
     verify_ssl = config.get('vcenter_verify_ssl', False)
 
-    if not all([host, user, password]):
+    # Короткое and-замыкание вместо all([...]): без аллокации списка
+    if not (host and user and password):
         raise ValueError("vCenter credentials not configured in PLUGINS_CONFIG")
 
     try:
@@ -89,9 +101,6 @@ def _connect_vcenter():
             disableSslCertValidation=not verify_ssl
         )
 
-        # Регистрируем автоматическое отключение при завершении
-        atexit.register(Disconnect, si)
-
         logger.info(f"Successfully connected to vCenter: {host}")
         return si
 
@@ -100,6 +109,204 @@ def _connect_vcenter():
         raise
 
 
+# Кэш живых сессий vCenter: ключ — (host, user).
+# SmartConnect — это полный TLS handshake + SOAP login (сотни миллисекунд),
+# поэтому сессия переиспользуется между запусками синхронизации
+# и проверками подключения вместо нового логина на каждый вызов.
+_si_cache: Dict[tuple, object] = {}
+_disconnect_registered = False
+
+# Интервал фонового keep-alive пинга кэшированных сессий (секунды).
+# vCenter закрывает сессии по idle-таймауту (обычно 30 минут) -
+# пинг раз в 10 минут удерживает их живыми между редкими синхронизациями
+_KEEPALIVE_INTERVAL = 600
+_keepalive_thread = None
+
+
+def _keepalive_loop():
+    """
+    Фоновый цикл: пингует кэшированные сессии vCenter раз в _KEEPALIVE_INTERVAL.
+
+    Умершие сессии удаляются из кэша - следующий вызов _get_si()
+    переподключится. Поток демонический и не мешает завершению процесса.
+    """
+    while True:
+        time.sleep(_KEEPALIVE_INTERVAL)
+        for key, si in list(_si_cache.items()):
+            try:
+                si.CurrentTime()
+            except Exception:
+                logger.info("vCenter keep-alive: session expired, dropping from cache")
+                _si_cache.pop(key, None)
+
+
+def _disconnect_cached_sessions():
+    """
+    Отключает все закэшированные сессии vCenter при завершении процесса.
+
+    Регистрируется в atexit один раз при первом подключении —
+    в отличие от регистрации на каждый SmartConnect, не накапливает
+    записи в atexit при долгоживущем воркере.
+    """
+    for si in _si_cache.values():
+        try:
+            Disconnect(si)
+        except Exception:
+            pass
+    _si_cache.clear()
+
+
+def _get_si():
+    """
+    Возвращает живую сессию vCenter, переиспользуя кэшированное подключение.
+
+    Валидность кэшированной сессии проверяется дешевым вызовом
+    CurrentTime(); если сессия протухла (таймаут на стороне vCenter,
+    обрыв сети) — выполняется повторный SmartConnect.
+
+    Returns:
+        ServiceInstance: Живой объект подключения к vCenter
+
+    Raises:
+        ValueError: Если не настроены учетные данные vCenter
+        Exception: Если не удалось подключиться к vCenter
+    """
+    global _disconnect_registered, _keepalive_thread
+
+    config = get_plugin_config()
+    key = (config.get('vcenter_host'), config.get('vcenter_user'))
+
+    si = _si_cache.get(key)
+    if si is not None:
+        try:
+            si.CurrentTime()
+            return si
+        except Exception:
+            logger.info("Cached vCenter session is no longer valid, reconnecting...")
+            _si_cache.pop(key, None)
+
+    si = _connect_vcenter()
+    _si_cache[key] = si
+
+    if not _disconnect_registered:
+        atexit.register(_disconnect_cached_sessions)
+        _disconnect_registered = True
+
+    # Запускаем keep-alive поток при первом успешном подключении
+    if _keepalive_thread is None:
+        _keepalive_thread = threading.Thread(
+            target=_keepalive_loop, name='vcenter-keepalive', daemon=True
+        )
+        _keepalive_thread.start()
+
+    return si
+
+
+@contextmanager
+def vcenter_session():
+    """
+    Контекстный менеджер сессии vCenter.
+
+    Выдает живую сессию из кэша (_get_si). На выходе сессия НЕ
+    закрывается — ею владеет кэш модуля, отключение выполняет единый
+    atexit-обработчик. При исключении внутри блока кэшированная сессия
+    инвалидируется: причиной ошибки могла быть умершая сессия, и
+    следующий вызов должен переподключиться заново.
+
+    Yields:
+        ServiceInstance: Живой объект подключения к vCenter
+
+    Example:
+        >>> with vcenter_session() as si:
+        ...     content = si.RetrieveContent()
+    """
+    si = _get_si()
+    try:
+        yield si
+    except Exception:
+        config = get_plugin_config()
+        _si_cache.pop((config.get('vcenter_host'), config.get('vcenter_user')), None)
+        raise
+
+
+# Интернированные имена свойств для props.get() в горячем цикле:
+# CPython сравнивает интернированные строки по идентичности, что
+# ускоряет dict-поиск по сравнению с посимвольным сравнением
+_P_NAME = sys.intern('name')
+_P_POWER_STATE = sys.intern('runtime.powerState')
+_P_INSTANCE_UUID = sys.intern('config.instanceUuid')
+_P_HOST = sys.intern('runtime.host')
+_P_DEVICES = sys.intern('config.hardware.device')
+_P_NUM_CPU = sys.intern('config.hardware.numCPU')
+_P_MEMORY_MB = sys.intern('config.hardware.memoryMB')
+_P_IP_ADDRESS = sys.intern('guest.ipAddress')
+_P_TOOLS_STATUS = sys.intern('guest.toolsStatus')
+_P_EXTRA_CONFIG = sys.intern('config.extraConfig')
+_P_CREATE_DATE = sys.intern('config.createDate')
+
+
+# Спецификации PropertyCollector, не зависящие от конкретного вызова.
+# Конструирование pyVmomi-объектов неожиданно дорогое (интроспекция типов
+# по каждому полю), а эти спеки - константы схемы, поэтому собираются
+# один раз (PropertySpec - по одному разу на комбинацию флагов).
+
+# Дешевые свойства, запрашиваемые всегда
+_VM_BASE_PATH_SET = ('name', 'runtime.powerState', 'config.instanceUuid', 'runtime.host', 'config.hardware.numCPU', 'config.hardware.memoryMB', 'guest.ipAddress', 'guest.toolsStatus', 'config.createDate')
+
+
+@lru_cache(maxsize=None)
+def _vm_property_spec(include_disks, include_extra_config):
+    """
+    PropertySpec под комбинацию флагов тяжелых свойств (кэшируется).
+
+    config.hardware.device и config.extraConfig - самые тяжелые свойства
+    в ответе PropertyCollector (десятки КБ на ВМ) и включаются только
+    по запросу потребителя.
+
+    Args:
+        include_disks: Запрашивать ли config.hardware.device
+        include_extra_config: Запрашивать ли config.extraConfig
+
+    Returns:
+        PropertySpec: Спецификация свойств VirtualMachine
+    """
+    path_set = list(_VM_BASE_PATH_SET)
+    if include_disks:
+        path_set.append('config.hardware.device')
+    if include_extra_config:
+        path_set.append('config.extraConfig')
+    return vmodl.query.PropertyCollector.PropertySpec(
+        type=vim.VirtualMachine,
+        pathSet=path_set
+    )
+
+_VM_TRAVERSAL_SPEC = vmodl.query.PropertyCollector.TraversalSpec(
+    type=vim.ContainerView,
+    path='view',
+    skip=False
+)
+
+# Спеки для карты хост → кластер: у хоста берем только parent,
+# у compute-ресурса (кластера) - только имя
+_HOST_PROPERTY_SPEC = vmodl.query.PropertyCollector.PropertySpec(
+    type=vim.HostSystem,
+    pathSet=['parent']
+)
+
+_CLUSTER_PROPERTY_SPEC = vmodl.query.PropertyCollector.PropertySpec(
+    type=vim.ComputeResource,
+    pathSet=['name']
+)
+
+
+# Маппинг состояний ВМ vCenter → формат плагина.
+# vCenter возвращает: 'poweredOn', 'poweredOff', 'suspended';
+# poweredOff и suspended считаем остановленными (default в .get()).
+# Dict-lookup вместо if/elif: в горячем цикле обработки ВМ это
+# один PyDict_GetItem на C-уровне без вызова Python-функции.
+_POWER_STATE_MAP = {'poweredOn': 'running'}
+
+
 def _map_power_state(power_state):
     """
     Конвертирует состояние ВМ из vCenter в формат плагина.
@@ -110,12 +317,7 @@ def _map_power_state(power_state):
     Returns:
         str: 'running' или 'stopped'
     """
-    # vCenter возвращает: 'poweredOn', 'poweredOff', 'suspended'
-    if power_state == 'poweredOn':
-        return 'running'
-    else:
-        # poweredOff и suspended считаем остановленными
-        return 'stopped'
+    return _POWER_STATE_MAP.get(power_state, 'stopped')
 
 
 def _extract_extraconfig_value(extra_config, key):
@@ -138,16 +340,25 @@ def _extract_extraconfig_value(extra_config, key):
         return None
 
     try:
-        # Используем генератор для поиска значения по ключу
-        return next(
-            (opt.value for opt in extra_config if getattr(opt, 'key', None) == key),
-            None
-        )
+        # Прямой цикл с ранним return вместо next(генератор, ...):
+        # без аллокации generator-фрейма на каждый вызов
+        for opt in extra_config:
+            if getattr(opt, 'key', None) == key:
+                return opt.value
+        return None
     except Exception as e:
         logger.warning(f"Failed to extract extraConfig value for key '{key}': {e}")
         return None
 
 
+# Регулярное выражение для парсинга guestInfo.detailed.data вида key='value'.
+# Компилируется один раз при импорте - функция вызывается на каждую ВМ
+_DETAILED_RE = re.compile(r"(\w+)='([^']*)'")
+
+# Ключи, извлекаемые из guestInfo.detailed.data
+_DETAILED_KEYS = ('prettyName', 'familyName', 'distroName', 'distroVersion', 'kernelVersion', 'bitness')
+
+
 def _extract_guestinfo_detailed_data(extra_config):
     """
     Извлекает и парсит данные guestInfo.detailed.data для виртуальной машины.
@@ -169,43 +380,68 @@ def _extract_guestinfo_detailed_data(extra_config):
         >>> print(os_info['prettyName'])
         Ubuntu 22.04.3 LTS
     """
-    import re
+    if not extra_config:
+        return dict.fromkeys(_DETAILED_KEYS)
 
-    # Дефолтные значения
-    default_result = {
-        "prettyName": None,
-        "familyName": None,
-        "distroName": None,
-        "distroVersion": None,
-        "kernelVersion": None,
-        "bitness": None,
-    }
+    # Обратная совместимость: строим словарь и делегируем map-варианту
+    return _extract_guestinfo_from_map(
+        {getattr(opt, 'key', None): opt.value for opt in extra_config}
+    )
 
-    if not extra_config:
-        return default_result
 
-    try:
-        # Извлекаем данные по ключу 'guestInfo.detailed.data'
-        detailed_data = next(
-            (opt.value for opt in extra_config if getattr(opt, 'key', None) == 'guestInfo.detailed.data'),
-            None
-        )
+def _extract_guestinfo_from_map(ec_map):
+    """
+    Извлекает информацию об ОС из готового словаря extraConfig.
 
-        # Если данные найдены, парсим их
-        if detailed_data:
-            parsed_data = dict(re.findall(r"(\w+)='([^']*)'", detailed_data))
-            return {
-                "prettyName": parsed_data.get('prettyName'),
-                "familyName": parsed_data.get('familyName'),
-                "distroName": parsed_data.get('distroName'),
-                "distroVersion": parsed_data.get('distroVersion'),
-                "kernelVersion": parsed_data.get('kernelVersion'),
-                "bitness": parsed_data.get('bitness'),
-            }
-    except Exception as e:
-        logger.warning(f"Failed to extract guestInfo.detailed.data: {e}")
+    Вариант _extract_guestinfo_detailed_data для горячего цикла:
+    принимает уже собранный словарь {key: value} вместо линейного
+    скана списка extraConfig.
+
+    Args:
+        ec_map: Словарь, собранный из config.extraConfig
+
+    Returns:
+        Dict: Словарь с информацией об ОС (см. _extract_guestinfo_detailed_data)
+    """
+    detailed_data = ec_map.get('guestInfo.detailed.data')
+
+    if detailed_data:
+        try:
+            parsed_data = dict(_DETAILED_RE.findall(detailed_data))
+            return {key: parsed_data.get(key) for key in _DETAILED_KEYS}
+        except Exception as e:
+            logger.warning(f"Failed to extract guestInfo.detailed.data: {e}")
+
+    return dict.fromkeys(_DETAILED_KEYS)
+
+
+# Кэш коротких имен backing-классов дисков: класс →
+# "FlatVer2" (из "vim.vm.device.VirtualDisk.FlatVer2BackingInfo").
+# Заполняется по мере встречаемости - различных типов единицы,
+# а строковая хирургия над __name__ уходит из per-device цикла
+_BACKING_SHORT_NAMES: Dict[type, str] = {}
 
-    return default_result
+# Один гибибайт (base-2) для пересчета размеров дисков
+_GIB = 1 << 30
+
+
+def _backing_short_name(backing_cls):
+    """
+    Возвращает короткое имя типа backing диска (например, "FlatVer2").
+
+    Args:
+        backing_cls: Класс объекта device.backing
+
+    Returns:
+        str: Короткое имя типа
+    """
+    name = _BACKING_SHORT_NAMES.get(backing_cls)
+    if name is None:
+        name = backing_cls.__name__
+        if 'BackingInfo' in name:
+            name = name.replace('vim.vm.device.VirtualDisk.', '').replace('BackingInfo', '')
+        _BACKING_SHORT_NAMES[backing_cls] = name
+    return name
 
 
 def _extract_disk_info(devices):
@@ -238,217 +474,343 @@ def _extract_disk_info(devices):
         Hard disk 1: 40000 MB, File: [datastore1] vm01/vm01.vmdk
         Hard disk 2: 100000 MB, File: [datastore1] vm01/vm01_1.vmdk
     """
-    disks = []
-
     if not devices:
-        return disks
-
-    try:
-        for device in devices:
-            # Проверяем, является ли устройство виртуальным диском
-            if type(device).__name__ == 'vim.vm.device.VirtualDisk':
-                try:
-                    # Извлекаем информацию о диске
-                    # VMware API возвращает в бинарных единицах (base-2), но vCenter UI показывает в десятичных (base-10)
-                    # Конвертируем: Bytes → GB (бинарные) → MB (десятичные) для соответствия vCenter UI
-                    # Формула: capacityInBytes / 1024^3 * 1000 (аналогично netbox-sync)
-                    if hasattr(device, 'capacityInBytes') and device.capacityInBytes:
-                        size_mb = int(device.capacityInBytes / 1024 / 1024 / 1024 * 1000)
-                    else:
-                        size_mb = 0
-
-                    disk_info = {
-                        'name': device.deviceInfo.label if hasattr(device.deviceInfo, 'label') else 'Unknown',
-                        'size_mb': size_mb,
-                    }
-
-                    # Получаем тип бэкенда, thin provisioning и путь к файлу
-                    if hasattr(device, 'backing'):
-                        backing_type = type(device.backing).__name__
-                        # Извлекаем короткое имя типа (например, "FlatVer2BackingInfo" -> "FlatVer2")
-                        if 'BackingInfo' in backing_type:
-                            backing_type = backing_type.replace('vim.vm.device.VirtualDisk.', '').replace('BackingInfo', '')
-
-                        disk_info['type'] = backing_type
-                        disk_info['thin_provisioned'] = getattr(device.backing, 'thinProvisioned', False)
-                        disk_info['file_name'] = getattr(device.backing, 'fileName', None)
-                    else:
-                        disk_info['type'] = 'Unknown'
-                        disk_info['thin_provisioned'] = False
-                        disk_info['file_name'] = None
-
-                    disks.append(disk_info)
-
-                except Exception as e:
-                    logger.warning(f"Failed to extract disk info for device {device}: {e}")
-                    continue
-
-    except Exception as e:
-        logger.warning(f"Failed to iterate through devices: {e}")
-
-    return disks
+        return []
+
+    # List comprehension вместо append в цикле: одна аллокация без
+    # амортизированных ресайзов списка. Сбойные устройства дают None
+    # из _build_disk и отбрасываются внешним фильтром
+    return [
+        disk for disk in (
+            _build_disk(device)
+            for device in devices
+            # isinstance - это C-уровневая проверка типа (плюс корректно
+            # ловит подклассы), в отличие от сравнения строк __name__
+            if isinstance(device, vim.vm.device.VirtualDisk)
+        )
+        if disk is not None
+    ]
 
 
-def get_vcenter_vms() -> List[Dict]:
+def _build_disk(device):
     """
-    Получает список виртуальных машин из VMware vCenter.
+    Собирает словарь с данными одного виртуального диска.
 
-    Использует PropertyCollector API для эффективного получения всех данных
-    одним запросом вместо множества отдельных запросов для каждой ВМ.
+    Args:
+        device: Устройство vim.vm.device.VirtualDisk
 
     Returns:
-        List[Dict]: Список словарей с данными о VM, каждый содержит:
-            - name (str): Имя виртуальной машины
-            - state (str): Состояние VM ('running' или 'stopped')
-            - vcenter_id (str): Уникальный идентификатор VM в vCenter (instanceUuid)
+        Dict или None: Данные диска (см. _extract_disk_info);
+        None, если данные устройства извлечь не удалось
+    """
+    try:
+        # Извлекаем информацию о диске
+        # VMware API возвращает в бинарных единицах (base-2), но vCenter UI показывает в десятичных (base-10)
+        # Конвертируем: Bytes → GB (бинарные) → MB (десятичные) для соответствия vCenter UI
+        # Формула: capacityInBytes * 1000 // 1024^3 (аналогично netbox-sync).
+        # Целочисленная арифметика: без FP-округления (float теряет
+        # точность выше 2^53 байт) и без трех делений на диск
+        capacity = getattr(device, 'capacityInBytes', 0)
+        size_mb = (capacity * 1000) // _GIB if capacity else 0
+
+        # getattr с default вместо hasattr+доступ: одно обращение
+        # к атрибуту вместо двух на C-fast-path без исключений
+        disk_info = {
+            'name': getattr(getattr(device, 'deviceInfo', None), 'label', 'Unknown'),
+            'size_mb': size_mb,
+        }
+
+        # Получаем тип бэкенда, thin provisioning и путь к файлу
+        backing = getattr(device, 'backing', None)
+        if backing is not None:
+            disk_info['type'] = _backing_short_name(type(backing))
+            disk_info['thin_provisioned'] = getattr(backing, 'thinProvisioned', False)
+            disk_info['file_name'] = getattr(backing, 'fileName', None)
+        else:
+            disk_info['type'] = 'Unknown'
+            disk_info['thin_provisioned'] = False
+            disk_info['file_name'] = None
+
+        return disk_info
 
-    Raises:
-        ValueError: Если не настроены учетные данные vCenter
-        Exception: При ошибке подключения или получения данных
+    except Exception as e:
+        logger.warning(f"Failed to extract disk info for device {device}: {e}")
+        return None
 
-    Example:
-        >>> vms = get_vcenter_vms()
-        >>> for vm in vms:
-        ...     print(f"{vm['name']}: {vm['state']}")
-        vm01: running
-        vm02: stopped
-        ...
-    """
-    vms = []
-    si = None
 
-    try:
-        # Подключаемся к vCenter
-        logger.info("Connecting to vCenter...")
-        si = _connect_vcenter()
-        content = si.RetrieveContent()
+def _build_host_cluster_map(content) -> Dict[str, str]:
+    """
+    Строит отображение {moref хоста: имя кластера} одним batch-запросом.
 
-        # Создаем container view для всех VirtualMachine объектов
-        container = content.rootFolder
-        container_view = content.viewManager.CreateContainerView(
-            container, [vim.VirtualMachine], True
-        )
+    Раньше имя кластера добывалось через host.parent.name - два ленивых
+    SOAP-вызова на каждую ВМ. Хостов и кластеров на порядки меньше, чем
+    ВМ, поэтому дешевле забрать их свойства одним PropertyCollector-запросом
+    заранее и дальше искать имя кластера по moref за O(1).
 
-        # Определяем нужные свойства для получения
-        property_spec = vmodl.query.PropertyCollector.PropertySpec(
-            type=vim.VirtualMachine,
-            pathSet=['name', 'runtime.powerState', 'config.instanceUuid', 'config.uuid', 'runtime.host', 'config.hardware.device', 'config.hardware.numCPU', 'config.hardware.memoryMB', 'guest.ipAddress', 'guest.toolsStatus', 'config.extraConfig', 'config.createDate']
-        )
+    Args:
+        content: ServiceContent подключения к vCenter
 
-        # Определяем объекты для запроса
-        traversal_spec = vmodl.query.PropertyCollector.TraversalSpec(
-            type=vim.ContainerView,
-            path='view',
-            skip=False
-        )
+    Returns:
+        Dict[str, str]: {str(moref хоста): имя кластера}
+    """
+    container_view = content.viewManager.CreateContainerView(
+        content.rootFolder, [vim.HostSystem, vim.ComputeResource], True
+    )
 
+    try:
         object_spec = vmodl.query.PropertyCollector.ObjectSpec(
             obj=container_view,
             skip=True,
-            selectSet=[traversal_spec]
+            selectSet=[_VM_TRAVERSAL_SPEC]
         )
-
-        # Создаем спецификацию фильтра
         filter_spec = vmodl.query.PropertyCollector.FilterSpec(
-            propSet=[property_spec],
+            propSet=[_HOST_PROPERTY_SPEC, _CLUSTER_PROPERTY_SPEC],
             objectSet=[object_spec]
         )
 
-        # Получаем ВСЕ свойства ВСЕХ ВМ одним запросом!
-        logger.info("Retrieving VM properties from vCenter (single request)...")
         options = vmodl.query.PropertyCollector.RetrieveOptions()
         result = content.propertyCollector.RetrievePropertiesEx(
             specSet=[filter_spec],
             options=options
         )
 
-        # Собираем все объекты из всех страниц (если есть pagination)
-        all_objects = []
+        host_parent = {}
+        cluster_names = {}
         while result:
-            all_objects.extend(result.objects)
+            for obj in result.objects:
+                props = {prop.name: prop.val for prop in obj.propSet}
+                if isinstance(obj.obj, vim.HostSystem):
+                    host_parent[str(obj.obj)] = props.get('parent')
+                else:
+                    cluster_names[str(obj.obj)] = props.get('name')
             if result.token:
                 result = content.propertyCollector.ContinueRetrievePropertiesEx(token=result.token)
             else:
                 break
 
-        # Обрабатываем результаты с прогресс-баром
-        logger.info(f"Processing {len(all_objects)} VMs...")
-        for obj in tqdm(all_objects, desc="Processing VMs", unit="VM"):
-            try:
-                # Собираем свойства в словарь
-                props = {}
-                for prop in obj.propSet:
-                    props[prop.name] = prop.val
-
-                # Формируем данные ВМ
-                vm_data = {
-                    'name': props.get('name', 'Unknown'),
-                    'state': _map_power_state(props.get('runtime.powerState', 'poweredOff')),
-                    'vcenter_id': props.get('config.instanceUuid') or props.get('config.uuid', ''),
-                    'vcpus': props.get('config.hardware.numCPU'),
-                    'memory': props.get('config.hardware.memoryMB'),
-                    'ip_address': props.get('guest.ipAddress'),
-                }
-
-                # Получаем имя кластера vCenter
-                try:
-                    host = props.get('runtime.host')
-                    if host and hasattr(host, 'parent') and hasattr(host.parent, 'name'):
-                        vm_data['vcenter_cluster'] = host.parent.name
-                    else:
-                        vm_data['vcenter_cluster'] = None
-                except Exception as e:
-                    logger.warning(f"Failed to get cluster for VM {vm_data['name']}: {e}")
-                    vm_data['vcenter_cluster'] = None
-
-                # Получаем информацию о дисках
-                devices = props.get('config.hardware.device')
-                vm_data['disks'] = _extract_disk_info(devices)
-
-                # Получаем информацию о VMware Tools
-                vm_data['tools_status'] = props.get('guest.toolsStatus')
-
-                # Извлекаем данные из config.extraConfig
-                extra_config = props.get('config.extraConfig')
-                vm_data['vmtools_description'] = _extract_extraconfig_value(extra_config, 'guestinfo.vmtools.description')
-                vm_data['vmtools_version_number'] = _extract_extraconfig_value(extra_config, 'guestinfo.vmtools.versionNumber')
-
-                # Извлекаем детальную информацию об ОС из guestInfo.detailed.data
-                os_info = _extract_guestinfo_detailed_data(extra_config)
-                vm_data['os_pretty_name'] = os_info['prettyName']
-                vm_data['os_family_name'] = os_info['familyName']
-                vm_data['os_distro_name'] = os_info['distroName']
-                vm_data['os_distro_version'] = os_info['distroVersion']
-                vm_data['os_kernel_version'] = os_info['kernelVersion']
-                vm_data['os_bitness'] = os_info['bitness']
-
-                # Получаем дату создания VM (сохраняем как есть без преобразования)
-                vm_data['creation_date'] = props.get('config.createDate')
-
-                vms.append(vm_data)
-
-            except Exception as e:
-                vm_name = props.get('name', 'unknown') if 'props' in locals() else 'unknown'
-                logger.warning(f"Failed to process VM {vm_name}: {e}")
-                continue
-
-        # Уничтожаем view
+        return {
+            host_moid: cluster_names.get(str(parent))
+            for host_moid, parent in host_parent.items()
+        }
+
+    finally:
         container_view.Destroy()
 
-        logger.info(f"Successfully retrieved {len(vms)} VMs from vCenter using PropertyCollector")
+
+def iter_vcenter_vms(include_disks: bool = True, include_extra_config: bool = True) -> Iterator[Dict]:
+    """
+    Генератор: отдает данные виртуальных машин из VMware vCenter по мере поступления.
+
+    Использует PropertyCollector API для эффективного получения всех данных
+    постраничными запросами вместо множества отдельных запросов для каждой ВМ.
+    Каждая страница обрабатывается сразу после получения, поэтому полный
+    список ВМ не удерживается в памяти дважды (pyVmomi-объекты + словари).
+
+    Args:
+        include_disks: Запрашивать config.hardware.device и собирать ключ
+            'disks'. Самое тяжелое свойство ответа (десятки КБ на ВМ) -
+            отключайте, если потребителю диски не нужны.
+        include_extra_config: Запрашивать config.extraConfig и собирать
+            ключи 'vmtools_*' и 'os_*'.
+
+    Yields:
+        Dict: Словарь с данными о VM, каждый содержит:
+            - name (str): Имя виртуальной машины
+            - state (str): Состояние VM ('running' или 'stopped')
+            - vcenter_id (str): Уникальный идентификатор VM в vCenter (instanceUuid)
+        При выключенных флагах соответствующие ключи отсутствуют.
+
+    Raises:
+        ValueError: Если не настроены учетные данные vCenter
+        Exception: При ошибке подключения или получения данных
+    """
+    total = 0
+
+    try:
+        # Получаем сессию vCenter (кэшированную или новую)
+        logger.info("Connecting to vCenter...")
+        with vcenter_session() as si:
+            content = si.RetrieveContent()
+
+            # Карта хост → имя кластера одним запросом до основного цикла
+            host_cluster_map = _build_host_cluster_map(content)
+
+            # Создаем container view для всех VirtualMachine объектов
+            container = content.rootFolder
+            container_view = content.viewManager.CreateContainerView(
+                container, [vim.VirtualMachine], True
+            )
+
+            # Из констант модуля собираем только то, что зависит от вызова:
+            # ObjectSpec привязан к созданному container_view
+            object_spec = vmodl.query.PropertyCollector.ObjectSpec(
+                obj=container_view,
+                skip=True,
+                selectSet=[_VM_TRAVERSAL_SPEC]
+            )
+
+            # Создаем спецификацию фильтра (PropertySpec - под флаги)
+            filter_spec = vmodl.query.PropertyCollector.FilterSpec(
+                propSet=[_vm_property_spec(include_disks, include_extra_config)],
+                objectSet=[object_spec]
+            )
+
+            # Получаем свойства ВСЕХ ВМ постраничными batch-запросами.
+            # Явный maxObjects ограничивает память на страницу и уберегает
+            # vCenter от 503-throttling на больших инвентарях; страницы
+            # обрабатывает цикл ContinueRetrievePropertiesEx ниже
+            options = vmodl.query.PropertyCollector.RetrieveOptions()
+            options.maxObjects = get_plugin_config().get('vcenter_page_size', 250)
+            result = content.propertyCollector.RetrievePropertiesEx(
+                specSet=[filter_spec],
+                options=options
+            )
+
+            # Обрабатываем каждую страницу сразу, не накапливая все объекты.
+            # Пока Python разбирает текущую страницу, следующая запрашивается
+            # фоновым потоком - сеть и обработка идут внахлест
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vcenter-page')
+            try:
+                while result:
+                    next_page = None
+                    if result.token:
+                        next_page = executor.submit(
+                            content.propertyCollector.ContinueRetrievePropertiesEx,
+                            token=result.token,
+                        )
+
+                    for obj in result.objects:
+                        # Собираем свойства одним dict comprehension до try-блока:
+                        # цикл выполняется на C-уровне, а падение здесь означало бы
+                        # некорректный ответ vCenter целиком, а не проблему одной ВМ
+                        props = {prop.name: prop.val for prop in obj.propSet}
+
+                        try:
+                            # Формируем данные ВМ
+                            vm_data = {
+                                'name': props.get(_P_NAME, 'Unknown'),
+                                'state': _POWER_STATE_MAP.get(props.get(_P_POWER_STATE), 'stopped'),
+                                'vcenter_id': props.get(_P_INSTANCE_UUID) or '',
+                                'vcpus': props.get(_P_NUM_CPU),
+                                'memory': props.get(_P_MEMORY_MB),
+                                'ip_address': props.get(_P_IP_ADDRESS),
+                            }
+
+                            # Имя кластера vCenter - из заранее построенной карты,
+                            # без ленивых SOAP-вызовов host.parent.name на каждую ВМ
+                            host = props.get(_P_HOST)
+                            vm_data['vcenter_cluster'] = host_cluster_map.get(str(host)) if host else None
+
+                            # Получаем информацию о дисках (если запрошена)
+                            if include_disks:
+                                devices = props.get(_P_DEVICES)
+                                vm_data['disks'] = _extract_disk_info(devices)
+
+                            # Получаем информацию о VMware Tools
+                            vm_data['tools_status'] = props.get(_P_TOOLS_STATUS)
+
+                            if include_extra_config:
+                                # Извлекаем данные из config.extraConfig: словарь строится
+                                # один раз, дальше все значения ищутся за O(1) вместо
+                                # трех линейных сканов списка на каждую ВМ
+                                extra_config = props.get(_P_EXTRA_CONFIG)
+                                ec_map = {getattr(opt, 'key', None): opt.value for opt in extra_config} if extra_config else {}
+                                vm_data['vmtools_description'] = ec_map.get('guestinfo.vmtools.description')
+                                vm_data['vmtools_version_number'] = ec_map.get('guestinfo.vmtools.versionNumber')
+
+                                # Извлекаем детальную информацию об ОС из guestInfo.detailed.data
+                                os_info = _extract_guestinfo_from_map(ec_map)
+                                vm_data['os_pretty_name'] = os_info['prettyName']
+                                vm_data['os_family_name'] = os_info['familyName']
+                                vm_data['os_distro_name'] = os_info['distroName']
+                                vm_data['os_distro_version'] = os_info['distroVersion']
+                                vm_data['os_kernel_version'] = os_info['kernelVersion']
+                                vm_data['os_bitness'] = os_info['bitness']
+
+                            # Получаем дату создания VM (сохраняем как есть без преобразования)
+                            vm_data['creation_date'] = props.get(_P_CREATE_DATE)
+
+                            total += 1
+                            # Прогресс пишем в лог раз в 1000 ВМ: tqdm под rq-воркером
+                            # писал бы в перехваченный stderr с блокировкой на итерацию
+                            if total % 1000 == 0:
+                                logger.info(f"Processed {total} VMs...")
+                            yield vm_data
+
+                        except Exception as e:
+                            logger.warning(f"Failed to process VM {props.get(_P_NAME, 'unknown')}: {e}")
+                            continue
+
+                    # Следующая страница уже получена (или докачивается) фоном
+                    result = next_page.result() if next_page is not None else None
+            finally:
+                executor.shutdown(wait=False)
+
+            # Уничтожаем view
+            container_view.Destroy()
+
+            logger.info(f"Successfully retrieved {total} VMs from vCenter using PropertyCollector")
 
     except Exception as e:
         logger.error(f"Error retrieving VMs from vCenter: {e}")
         raise
 
-    finally:
-        # Отключаемся от vCenter
-        if si:
-            try:
-                Disconnect(si)
-            except:
-                pass
 
+# Кэш результата get_vcenter_vms в рамках процесса: повторные вызовы
+# в течение TTL (vcenter_cache_ttl, по умолчанию 60 сек) не запускают
+# полный обход инвентаря заново
+_VMS_CACHE = {'data': None, 'ts': 0.0, 'flags': None}
+
+
+def get_vcenter_vms(
+    refresh: bool = False,
+    include_disks: bool = True,
+    include_extra_config: bool = True,
+) -> List[Dict]:
+    """
+    Получает полный список виртуальных машин из VMware vCenter.
+
+    Обертка над генератором iter_vcenter_vms() с коротким TTL-кэшем
+    на процесс: если список запрошен повторно в течение
+    vcenter_cache_ttl секунд, возвращается закэшированный результат.
+    Используйте iter_vcenter_vms() напрямую, если данные можно
+    обрабатывать потоково, не материализуя весь список.
+
+    Args:
+        refresh: Принудительно обновить данные, игнорируя кэш
+        include_disks: См. iter_vcenter_vms
+        include_extra_config: См. iter_vcenter_vms
+
+    Returns:
+        List[Dict]: Список словарей с данными о VM (см. iter_vcenter_vms)
+
+    Raises:
+        ValueError: Если не настроены учетные данные vCenter
+        Exception: При ошибке подключения или получения данных
+
+    Example:
+        >>> vms = get_vcenter_vms()
+        >>> for vm in vms:
+        ...     print(f"{vm['name']}: {vm['state']}")
+        vm01: running
+        vm02: stopped
+        ...
+    """
+    flags = (include_disks, include_extra_config)
+    ttl = get_plugin_config().get('vcenter_cache_ttl', 60)
+    if (
+        not refresh
+        and _VMS_CACHE['data'] is not None
+        and _VMS_CACHE['flags'] == flags
+        and time.monotonic() - _VMS_CACHE['ts'] < ttl
+    ):
+        logger.info("Returning vCenter VM list from in-process cache")
+        return _VMS_CACHE['data']
+
+    vms = list(iter_vcenter_vms(include_disks, include_extra_config))
+    _VMS_CACHE['data'] = vms
+    _VMS_CACHE['ts'] = time.monotonic()
+    _VMS_CACHE['flags'] = flags
     return vms
 
 
@@ -467,16 +829,13 @@ def test_vcenter_connection() -> bool:
         ... else:
         ...     print("Ошибка подключения к vCenter")
     """
-    si = None
     try:
-        # Подключаемся к vCenter
-        si = _connect_vcenter()
-
-        # Проверяем, что можем получить content
-        content = si.RetrieveContent()
+        with vcenter_session() as si:
+            # Проверяем, что можем получить content
+            content = si.RetrieveContent()
 
-        # Проверяем доступность основных API
-        _ = content.about.fullName
+            # Проверяем доступность основных API
+            _ = content.about.fullName
 
         logger.info("vCenter connection test successful")
         return True
@@ -484,11 +843,3 @@ def test_vcenter_connection() -> bool:
     except Exception as e:
         logger.error(f"vCenter connection test failed: {e}")
         return False
-
-    finally:
-        # Отключаемся от vCenter
-        if si:
-            try:
-                Disconnect(si)
-            except:
-                pass
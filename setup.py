@@ -9,7 +9,6 @@ setup(
     license='Apache 2.0',
     install_requires=[
         'pyvmomi>=8.0.0.1',
-        'tqdm',
     ],
     packages=find_packages(),
     include_package_data=True,